@@ -0,0 +1,345 @@
+"""
+엔드투엔드 벤치마크: daily / weekly / monthly 파이프라인을 로컬 API 대역(utils.replay) + SMTP 대역(utils.smtp_sink)에 붙여 실행
+
+  python bench/run.py                                  # 합성 코퍼스 500/5000/20000개, 결과 JSON 을 stdout 으로
+  python bench/run.py --sizes 2000 --pipelines daily --repeat 3
+  python bench/run.py --fixtures fixtures/live         # 녹화 픽스처(HTTP_RECORD_DIR 로 저장한 것) 재생
+  python bench/run.py --save-baseline                  # bench/baseline.json 갱신
+  python bench/run.py --compare bench/baseline.json --threshold 0.25   # 기준 대비 회귀 시 exit 1
+
+- (파이프라인, 크기)마다 빈 임시 작업 디렉토리 + 별도 프로세스로 실행 → 캐시/저장소/쿼터 장부가 섞이지 않고 peak RSS 도 따로 잰다
+- 단계 = 파이프라인 함수 래핑 (포함 시간, 스레드 안에서 불린 단계는 스레드별 시간의 합)
+  api.<endpoint> 단계에는 호출 수와 쿼터 단위(utils.quota.RUN)를 같이 기록
+- 메모리: ru_maxrss 는 프로세스 전체의 최고치라 단계별 최고치가 아니다
+  → 단계에는 끝난 시점의 프로세스 최고치(proc_peak_rss_kb)와 그 단계가 최고치를 올린 양(peak_raise_kb)만 남기고,
+    회귀 비교는 파이프라인 전체 peak_rss_kb(자식 프로세스 하나 = 파이프라인 하나)로만 한다
+- 진입점 import 시간(cli/main/weekly_report/monthly_report, 새 프로세스 최솟값)도 같이 재고 기준과 비교
+- weekly 는 코퍼스 전체를 저장소/키워드 시계열에 미리 넣고 시작 (매일 쌓인 상태를 흉내), monthly 는 히스토리 없는 플랜B 경로
+"""
+import os, sys, json, time, random, shutil, resource, argparse, tempfile, threading, subprocess
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
+
+PIPELINES = ("daily", "weekly", "monthly")
+DEFAULT_SIZES = "500,5000,20000"
+BASELINE_PATH = ROOT / "bench" / "baseline.json"
+IMPORT_MODULES = ("cli", "main", "weekly_report", "monthly_report")
+IMPORT_SLACK_MS = 5
+SEARCH_CAP = 500     # YouTube search 는 쿼리당 최대 500건 정도만 페이지로 준다
+
+# ---- 합성 코퍼스 ----
+FILLER = ["할머니", "아버지", "어머니", "며느리", "이야기", "마지막", "결국", "그날", "진실", "충격",
+          "인생", "시니어", "노년", "아들", "딸", "남편", "아내", "시골", "집", "편지"]
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _parse_iso(s):
+    return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp() if s else None
+
+class Corpus:
+    """결정적 합성 영상 코퍼스 → search/videos 응답 (replay.make_server resolver)."""
+    def __init__(self, size: int, now: datetime, seed: int = 7):
+        import yaml
+        from utils.topics import KEYWORDS    # utils.io 는 import 시 data/ 를 만들므로 부모 프로세스에선 쓰지 않는다
+        story = yaml.safe_load((ROOT / "config" / "keywords.yaml").read_text(encoding="utf-8")).get("story", {})
+        must, inc = story.get("must_phrases", []), story.get("include", [])
+        kw = [w for ws in KEYWORDS.values() for w in ws]
+        rnd = random.Random(seed)
+        self.now = now
+        self.items = []
+        for i in range(size):
+            words = rnd.sample(FILLER, 3) + rnd.sample(kw, 2)
+            if rnd.random() < 0.6: words.append(rnd.choice(must))
+            if rnd.random() < 0.5: words.append(rnd.choice(inc))
+            rnd.shuffle(words)
+            self.items.append(self._item(f"bv{i:09d}", words, rnd))
+        self.items.sort(key=lambda x: -int(x["statistics"]["viewCount"]))
+        self.by_id = {x["id"]: x for x in self.items}
+        self._pub = [_parse_iso(x["snippet"]["publishedAt"]) for x in self.items]
+
+    def _item(self, vid, words, rnd):
+        dur = rnd.randint(5 * 60, 150 * 60)
+        pub = self.now - timedelta(seconds=rnd.uniform(0, 40 * 86400))
+        return {
+            "id": vid,
+            "snippet": {"title": " ".join(words), "tags": rnd.sample(words, min(3, len(words))),
+                        "channelTitle": f"채널{rnd.randrange(200)}", "publishedAt": _iso(pub),
+                        "description": " ".join(rnd.sample(FILLER, 5))},
+            "contentDetails": {"duration": f"PT{dur//3600}H{dur%3600//60}M{dur%60}S"},
+            "statistics": {"viewCount": str(int(10 ** rnd.uniform(3, 7)))},
+        }
+
+    def video(self, vid):
+        # 코퍼스 밖 id (앵커 영상 등)는 id 기준으로 결정적으로 만든다
+        if vid in self.by_id: return self.by_id[vid]
+        rnd = random.Random(vid)
+        return self._item(vid, rnd.sample(FILLER, 4), rnd)
+
+    def search(self, params):
+        lo, hi = _parse_iso(params.get("publishedAfter")), _parse_iso(params.get("publishedBefore"))
+        hits = [x for x, p in zip(self.items, self._pub)
+                if (lo is None or p >= lo) and (hi is None or p < hi)][:SEARCH_CAP]
+        off, n = int(params.get("pageToken") or 0), int(params.get("maxResults") or 5)
+        page = [{"id": {"kind": "youtube#video", "videoId": x["id"]},
+                 "snippet": {k: x["snippet"][k] for k in ("title", "channelTitle", "publishedAt", "description")}}
+                for x in hits[off:off + n]]
+        out = {"items": page, "pageInfo": {"totalResults": len(hits)}}
+        if off + n < len(hits): out["nextPageToken"] = str(off + n)
+        return out
+
+    def resolve(self, host, path, params):
+        ep = path.rsplit("/", 1)[-1]
+        if ep == "search": body = self.search(params)
+        elif ep == "videos": body = {"items": [self.video(i) for i in params.get("id", "").split(",") if i]}
+        elif ep in ("channels", "playlistItems"): body = {"items": []}
+        else: return None
+        return 200, "application/json; charset=UTF-8", json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+# ---- 자식 프로세스: 단계 계측 후 파이프라인 1회 실행 ----
+def _maxrss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss    # Linux: KB
+
+class Stages:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+
+    def wrap(self, mod, name, stage=None):
+        """mod.name 을 계측 래퍼로 교체. stage 는 이름 또는 (args, kwargs) → 이름."""
+        fn = getattr(mod, name)
+        if getattr(fn, "_bench", False): return    # 이미 래핑된 함수를 from-import 한 모듈
+        def timed(*a, **kw):
+            label = stage(a, kw) if callable(stage) else (stage or name)
+            rss0, t0 = _maxrss(), time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                ms, rss1 = (time.perf_counter() - t0) * 1000, _maxrss()
+                with self.lock:
+                    s = self.data.setdefault(label, {"calls": 0, "wall_ms": 0.0, "proc_peak_rss_kb": 0, "peak_raise_kb": 0})
+                    s["calls"] += 1
+                    s["wall_ms"] += ms
+                    s["proc_peak_rss_kb"] = max(s["proc_peak_rss_kb"], rss1)   # 프로세스 최고치 (단계 단독 아님)
+                    s["peak_raise_kb"] += rss1 - rss0                          # 이 단계 동안 최고치가 오른 양
+        timed._bench = True
+        setattr(mod, name, timed)
+
+    def wrap_api(self, *mods):
+        for m in mods:
+            self.wrap(m, "api_get", lambda a, kw: f"api.{a[0] if a else kw.get('endpoint')}")
+
+def _child(a):
+    st = Stages()
+    from utils import youtube, channels
+    st.wrap_api(youtube, channels)
+    st.wrap(youtube, "hydrate")
+    st.wrap(youtube, "filter_story")
+
+    if a.child == "daily":
+        import main as m
+        for name, stage in [("attach_similarity", "similarity"), ("filter_story", "filter_story"),
+                            ("sync_anchor_channels", "channel_sync"), ("extract_top_keywords", "extract_top_keywords"),
+                            ("make_strong_titles_from_keywords", "make_titles"), ("email_md", "render_md"),
+                            ("send_email_markdown", "smtp")]:
+            st.wrap(m, name, stage)
+        run = m.main
+    elif a.child == "weekly":
+        if a.size != "recorded":
+            from utils import store, kwseries, hitters
+            recs = [youtube.to_record(x) for x in Corpus(int(a.size), datetime.fromisoformat(a.now), a.seed).items]
+            new = set(store.save_records(recs))
+            kwseries.ingest([r for r in recs if r["id"] in new])
+            hitters.ingest([r for r in recs if r["id"] in new]); hitters.flush()
+        import weekly_report as w
+        from utils import kwseries, history
+        st.wrap_api(w)
+        st.wrap(w, "hydrate")
+        st.wrap(w, "youtube_search_recent", "search")
+        st.wrap(kwseries, "window_counts", "rising")
+        st.wrap(w, "write_csv", "csv")
+        st.wrap(history, "write_week", "history")
+        st.wrap(w, "build_weekly_markdown_and_csv", "build_report")
+        st.wrap(w, "send_email_markdown", "smtp")
+        run = w.main
+    else:
+        import monthly_report as mr
+        st.wrap_api(mr)
+        st.wrap(mr, "hydrate")
+        st.wrap(mr, "youtube_search_recent", "search")
+        st.wrap(mr, "load_period", "load_period")
+        st.wrap(mr, "build_pdf", "render_pdf")
+        st.wrap(mr, "send_email_with_pdf", "smtp")
+        run = lambda: mr.main("month")
+
+    t0 = time.perf_counter()
+    run()
+    wall = (time.perf_counter() - t0) * 1000
+
+    from utils import quota, http_client
+    from utils.io import flush_logs
+    flush_logs()
+    by_ep = {}
+    for (_, ep), r in quota.RUN.items():
+        e = by_ep.setdefault(ep, {"calls": 0, "units": 0, "refused": 0})
+        for k in e: e[k] += r[k]
+    for name, s in st.data.items():
+        if name.startswith("api."):
+            s["units"] = by_ep.get(name[4:], {}).get("units", 0)
+        s["wall_ms"] = round(s["wall_ms"], 2)
+    result = {
+        "pipeline": a.child, "size": a.size, "wall_ms": round(wall, 2), "peak_rss_kb": _maxrss(),
+        "stages": dict(sorted(st.data.items())),
+        "api": {"http_calls": sum(s["count"] for s in http_client.STATS.values()),
+                "units": sum(e["units"] for e in by_ep.values()), "by_endpoint": by_ep},
+    }
+    Path(a.result).write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+
+# ---- 부모 프로세스: 대역 서버 기동 + (파이프라인, 크기)별 실행 ----
+def _serve(srv):
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv.server_address[1]
+
+def run_one(pipeline, size, a, now):
+    from utils import replay, smtp_sink
+    corpus = Corpus(int(size), now, a.seed) if size != "recorded" else None
+    api = replay.make_server(a.fixtures, 0, a.latency_ms, a.jitter_ms,
+                             fixtures=None if a.fixtures else {}, resolver=corpus.resolve if corpus else None)
+    smtp = smtp_sink.make_server(0)
+    api_port, smtp_port = _serve(api), _serve(smtp)
+    work = Path(tempfile.mkdtemp(prefix=f"bench-{pipeline}-"))
+    try:
+        shutil.copytree(ROOT / "config", work / "config")
+        env = dict(os.environ, **replay.base_env(api_port))
+        env.update({
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+            "YOUTUBE_API_KEY": "bench", "SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(smtp_port),
+            "SMTP_USER": "bench@localhost", "SMTP_PASS": "bench", "REPORT_EMAIL_TO": "bench@localhost",
+            "SMTP_USE_TLS": "0", "SMTP_SSL": "0", "LOG_LEVEL": a.log_level, "HTTP_RECORD_DIR": "",
+        })
+        res = work / "result.json"
+        cmd = [sys.executable, str(Path(__file__).resolve()), "--child", pipeline, "--size", str(size),
+               "--now", now.isoformat(), "--seed", str(a.seed), "--result", str(res)]
+        p = subprocess.run(cmd, cwd=work, env=env, capture_output=True, text=True, timeout=a.timeout)
+        if p.returncode != 0 or not res.exists():
+            raise RuntimeError(f"{pipeline}/{size} 실패 (exit {p.returncode}):\n{p.stderr[-2000:]}")
+        out = json.loads(res.read_text(encoding="utf-8"))
+        out["server"] = dict(api.stats, mails=len(smtp.messages))
+        return out
+    finally:
+        api.shutdown(); smtp.shutdown()
+        api.server_close(); smtp.server_close()
+        if not a.keep: shutil.rmtree(work, ignore_errors=True)
+
+def measure_imports(repeat: int = 5):
+    """모듈별 콜드 import 시간(ms): 새 인터프리터에서 repeat 번 중 최솟값."""
+    code = "import sys, time; t = time.perf_counter(); __import__(sys.argv[1]); print((time.perf_counter() - t) * 1000)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    out = {}
+    with tempfile.TemporaryDirectory(prefix="bench-import-") as work:    # utils.io 가 import 시 data/ 를 만든다
+        for mod in IMPORT_MODULES:
+            runs = [float(subprocess.run([sys.executable, "-c", code, mod], cwd=work, env=env, check=True,
+                                         capture_output=True, text=True).stdout.strip().splitlines()[-1])
+                    for _ in range(repeat)]
+            out[mod] = round(min(runs), 2)
+    return out
+
+def _best(runs):
+    """반복 실행 중 단계별 최소 시간 (나머지 값은 첫 실행)."""
+    out = json.loads(json.dumps(runs[0]))
+    out["wall_ms"] = min(r["wall_ms"] for r in runs)
+    for name, s in out["stages"].items():
+        s["wall_ms"] = min(r["stages"].get(name, s)["wall_ms"] for r in runs)
+    out["runs"] = len(runs)
+    return out
+
+def compare(results, baseline, threshold, min_ms, imports=None):
+    """기준 대비 회귀 목록. 시간/RSS 는 threshold 비율 + min_ms 초과, API 호출·쿼터 단위는 조금이라도 늘면 회귀.
+    import 시간은 전체가 수십 ms 라 min_ms 대신 IMPORT_SLACK_MS 를 쓴다."""
+    base = {(r["pipeline"], str(r["size"])): r for r in baseline.get("results", [])}
+    out = []
+    for mod, cur in (imports or {}).items():
+        old = baseline.get("imports", {}).get(mod)
+        if old is not None and cur > old * (1 + threshold) and cur - old > IMPORT_SLACK_MS:
+            out.append({"pipeline": "import", "size": mod, "metric": "import_ms", "baseline": old, "current": cur,
+                        "change_pct": round((cur - old) / old * 100, 1) if old else None})
+    def check(r, metric, cur, old, slack):
+        if old is not None and cur > old * (1 + threshold) and cur - old > slack:
+            out.append({"pipeline": r["pipeline"], "size": r["size"], "metric": metric, "baseline": old, "current": cur,
+                        "change_pct": round((cur - old) / old * 100, 1) if old else None})
+    for r in results:
+        b = base.get((r["pipeline"], str(r["size"])))
+        if not b: continue
+        check(r, "wall_ms", r["wall_ms"], b["wall_ms"], min_ms)
+        for name, s in r["stages"].items():
+            check(r, f"stages.{name}.wall_ms", s["wall_ms"], b["stages"].get(name, {}).get("wall_ms"), min_ms)
+        check(r, "peak_rss_kb", r["peak_rss_kb"], b["peak_rss_kb"], 1024)
+        for k in ("http_calls", "units"):
+            cur, old = r["api"][k], b["api"][k]
+            if cur > old:
+                out.append({"pipeline": r["pipeline"], "size": r["size"], "metric": f"api.{k}", "baseline": old, "current": cur})
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="daily/weekly/monthly 엔드투엔드 벤치마크")
+    ap.add_argument("--pipelines", default=",".join(PIPELINES))
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="합성 코퍼스 영상 수 (쉼표 구분)")
+    ap.add_argument("--fixtures", help="녹화 픽스처 디렉토리 (지정 시 합성 코퍼스 대신 사용)")
+    ap.add_argument("--repeat", type=int, default=3, help="반복 실행 후 단계별 최솟값 (잡음 완화)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--jitter-ms", type=float, default=0)
+    ap.add_argument("--timeout", type=float, default=600)
+    ap.add_argument("--log-level", default="ERROR")
+    ap.add_argument("--out", help="결과 JSON 경로 (없으면 stdout)")
+    ap.add_argument("--compare", nargs="?", const=str(BASELINE_PATH), help="기준 JSON (기본 bench/baseline.json)")
+    ap.add_argument("--threshold", type=float, default=0.25, help="허용 회귀 비율")
+    ap.add_argument("--min-ms", type=float, default=20, help="이보다 작은 시간 차이는 회귀로 보지 않음")
+    ap.add_argument("--save-baseline", nargs="?", const=str(BASELINE_PATH))
+    ap.add_argument("--keep", action="store_true", help="임시 작업 디렉토리 남기기")
+    ap.add_argument("--no-imports", action="store_true", help="import 시간 측정 생략")
+    # 내부용 (자식 프로세스)
+    ap.add_argument("--child", choices=PIPELINES, help=argparse.SUPPRESS)
+    ap.add_argument("--size", help=argparse.SUPPRESS)
+    ap.add_argument("--now", help=argparse.SUPPRESS)
+    ap.add_argument("--result", help=argparse.SUPPRESS)
+    a = ap.parse_args(argv)
+    if a.child:
+        return _child(a)
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    sizes = ["recorded"] if a.fixtures else [s.strip() for s in a.sizes.split(",") if s.strip()]
+    results = []
+    for size in sizes:
+        for pipeline in [p.strip() for p in a.pipelines.split(",") if p.strip()]:
+            results.append(_best([run_one(pipeline, size, a, now) for _ in range(max(1, a.repeat))]))
+            print(f"bench {pipeline:<7} size={size:<8} {results[-1]['wall_ms']:>9.1f} ms  "
+                  f"rss={results[-1]['peak_rss_kb']//1024} MB  units={results[-1]['api']['units']}", file=sys.stderr)
+
+    imports = {} if a.no_imports else measure_imports()
+    for mod, ms in imports.items():
+        print(f"bench import  {mod:<16} {ms:>9.1f} ms", file=sys.stderr)
+
+    report = {"meta": {"date": now.isoformat(), "python": sys.version.split()[0], "sizes": sizes,
+                       "repeat": a.repeat, "seed": a.seed, "latency_ms": a.latency_ms},
+              "imports": imports, "results": results}
+    regressions = []
+    if a.compare:
+        baseline = json.loads(Path(a.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, a.threshold, a.min_ms, imports)
+        report["comparison"] = {"baseline": a.compare, "threshold": a.threshold, "min_ms": a.min_ms,
+                                "regressions": regressions}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if a.out: Path(a.out).write_text(text, encoding="utf-8")
+    else: print(text)
+    if a.save_baseline:
+        Path(a.save_baseline).write_text(text, encoding="utf-8")
+    for r in regressions:
+        print(f"회귀: {r['pipeline']}/{r['size']} {r['metric']} {r['baseline']} → {r['current']}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+통합 진입점
+  python cli.py [--profile] daily
+  python cli.py weekly
+  python cli.py monthly [--period month|quarter|year]
+  python cli.py all                 # 한 프로세스에서 daily → weekly → monthly
+  python cli.py deliver             # 보내기함(data/outbox)에 남은 메일만 발송
+
+- 작업 모듈(requests/reportlab/메일 등)은 서브커맨드가 실행될 때만 import → --help 나 히스토리만 읽는 작업은 가볍다
+- all: HTTP 커넥션 풀, 디스크 캐시/저장소 연결, 설정 파싱 결과를 작업 간에 공유
+  (캐시/HTTP/쿼터 통계는 프로세스 누적이라 뒤 작업 요약에 앞 작업 몫이 포함된다)
+  메일은 보내기함에 모았다가 마지막에 SMTP 세션 한 번으로 발송
+"""
+import os, sys, argparse
+
+def run_daily(a):
+    import main
+    main.main()
+
+def run_weekly(a):
+    import weekly_report
+    weekly_report.main()
+
+def run_monthly(a):
+    import monthly_report
+    monthly_report.main(a.period)
+
+def run_deliver(a):
+    from utils.outbox import deliver
+    deliver()
+
+JOBS = {"daily": run_daily, "weekly": run_weekly, "monthly": run_monthly}
+
+def run_all(a):
+    from utils.io import log_error
+    from utils import outbox
+    failed = []
+    try:
+        with outbox.batch():
+            for name, job in JOBS.items():
+                try:
+                    job(a)
+                except Exception as e:
+                    # 한 작업이 실패해도 나머지는 계속, 끝에서 실패로 종료
+                    log_error(f"{name} 실패: {type(e).__name__}: {e}", job=name)
+                    failed.append(name)
+    except Exception as e:
+        log_error(f"메일 발송 실패: {type(e).__name__}: {e}", job="deliver")
+        failed.append("deliver")
+    if failed:
+        raise SystemExit(f"실패한 작업: {', '.join(failed)}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="시니어 트렌드 리포트 작업")
+    ap.add_argument("--profile", action="store_true", help="cProfile 로 실행, data/outputs/profile-<작업>.pstats 저장")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("daily", help="인생스토리 Top10 + 신규 제목 메일")
+    sub.add_parser("weekly", help="주간 트렌드 리포트 메일 + 스냅샷")
+    for name in ("monthly", "all"):
+        p = sub.add_parser(name, help="월간/분기/연간 PDF 메일" if name == "monthly" else "daily → weekly → monthly")
+        p.add_argument("--period", choices=["month", "quarter", "year"],
+                       default=os.getenv("REPORT_PERIOD", "month").lower())
+    sub.add_parser("deliver", help="보내기함에 남은 메일 발송")
+    a = ap.parse_args(argv)
+    job = {"all": run_all, "deliver": run_deliver}.get(a.cmd) or JOBS[a.cmd]
+    if a.profile:
+        from utils.trace import profiled
+        return profiled(job, a.cmd, a)
+    return job(a)
+
+if __name__ == "__main__":
+    sys.exit(main())
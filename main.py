@@ -1,12 +1,33 @@
-import os
+import os, heapq, argparse
 from pathlib import Path
+from datetime import datetime, timezone
 from utils.io import OUT_DIR, now_kst, load_yaml, log_fallback, log_summary, log_pick
 from utils.emailer import send_email_markdown
-from utils.youtube import search_story_candidates, filter_story
+from utils.youtube import search_story_candidates, stream_story_candidates, filter_story, within_days
 from utils.nlp import extract_top_keywords, make_strong_titles_from_keywords
+from utils.hitters import top_keywords
+from utils.channels import sync_anchor_channels, channel_candidates
+from utils.similarity import attach_similarity
+from utils.cache import log_cache_stats
+from utils.http_client import log_http_stats
+from utils.quota import set_entry, log_quota_summary
+from utils.trace import span, profiled
 
 REPORT_PATH=OUT_DIR/"report.md"
 
+# 폴백 구간 검색 방식
+# - incremental: 새로 넓어진 날짜 구간만 스트리밍 검색 (기본)
+#   이전 구간은 끝까지 소진된 뒤에만 다음 구간으로 넘어오므로, 남은 후보는 새 구간에만 있다
+# - wide: 가장 넓은 구간을 한 번만 검색 후 로컬에서 구간 분할
+# - per_window: 구간마다 전체 구간 스트리밍 검색 (이전 방식)
+SEARCH_MODE=os.getenv("STORY_SEARCH_MODE","incremental").lower()
+
+# 후보 출처: search(키워드 검색) / channels(anchors.yaml 채널 업로드, 1단위) / both
+SOURCE=os.getenv("STORY_SOURCE","both").lower()
+
+# 앵커 영상과의 TF-IDF 코사인 유사도 하한 (0이면 점수만 표시)
+SIM_MIN=float(os.getenv("STORY_SIM_MIN","0"))
+
 def _env():
     need=["YOUTUBE_API_KEY","SMTP_HOST","SMTP_PORT","SMTP_USER","SMTP_PASS","REPORT_EMAIL_TO"]
     miss=[k for k in need if not os.getenv(k)]
@@ -16,7 +37,8 @@ def load_kw():
     c=load_yaml("config/keywords.yaml").get("story",{})
     return c.get("must_phrases",[]), c.get("include",[]), c.get("exclude",[])
 
-def email_md(videos, kw, titles, note):
+@span("render_md")
+def email_md(videos, kw, titles, note, trend=None):
     ts=now_kst().strftime("%Y-%m-%d %H:%M")
     L=[
         f"# 시니어 인생스토리 리포트 — {ts}",
@@ -31,40 +53,78 @@ def email_md(videos, kw, titles, note):
         s=v['durationSec']%60
         up=v['publishedAt'].replace("T"," ").replace("Z","")
         L.append(f"{i}. **[{v['title']}]({url})**")
-        L.append(f"   - 조회수: {v['views']:,} · {m}:{s:02d} · {v['channel']} · {up}")
-    L+=["","## B) 키워드", "- "+", ".join(kw),"","## C) 신규 제목 10개"]
+        sim=f" · 유사도 {v['sim']:.2f}" if v.get("sim") is not None else ""
+        L.append(f"   - 조회수: {v['views']:,} · {m}:{s:02d} · {v['channel']} · {up}{sim}")
+    L+=["","## B) 키워드", "- "+", ".join(kw)]
+    if trend: L.append("- 누적 상위(후보 전체, 감쇠): "+", ".join(trend))
+    L+=["","## C) 신규 제목 10개"]
     for t in titles:
         L.append(f"- **{t['title']}** / 썸네일: {t['thumb']}")
     return "\n".join(L)
 
+@span("daily")
 def main():
     _env()
+    set_entry("daily")
     must,inc,exc=load_kw()
     plans=[(7,"7일"),(14,"14일"),(21,"21일"),(28,"28일"),(35,"35일")]
     picked=[];seen=set()
     extra="사연 감동 가족 황혼 연애 상속 유산"
 
+    now=datetime.now(timezone.utc)
+    use_search=SOURCE!="channels"
+    refs=sync_anchor_channels("story") if SOURCE!="search" else []
+
+    pool={}   # wide 모드: 필터를 통과한 후보 (id -> video)
+    if SEARCH_MODE=="wide":
+        widest=plans[-1][0]
+        c=search_story_candidates(must,widest,extra,max_pages=5,now=now) if use_search else []
+        c+=channel_candidates(refs,widest,now=now)
+        k=attach_similarity(filter_story(c,must,inc,exc,step=widest),"story",SIM_MIN,step=widest)
+        pool.update((v["id"],v) for v in k)
+
+    prev=0
     for days,note in plans:
         log_fallback(cat="스토리", step=days, days=days)
-        c=search_story_candidates(must,days,extra,max_pages=5)
-        k=filter_story(c,must,inc,exc,step=days)
+        prio="normal" if days==plans[0][0] else "low"   # 후순위 폴백 구간은 쿼터 부족 시 거절
+        if SEARCH_MODE=="wide":
+            k=within_days(pool.values(),days,now=now)
+        else:
+            # 생성기: 10개가 차서 break 하면 남은 검색/보강/필터는 실행되지 않는다
+            since=prev if SEARCH_MODE=="incremental" else 0
+            sim=lambda vs,step=days: attach_similarity(vs,"story",SIM_MIN,step=step)
+            chan=sim(filter_story(channel_candidates(refs,days,until_days=since,now=now),must,inc,exc,step=days))
+            srch=stream_story_candidates(must,inc,exc,days,extra,step=days,max_pages=5,until_days=since,now=now,priority=prio,post=sim) if use_search else []
+            # 둘 다 (대략) 조회수 내림차순 → 지연 병합 (검색 생성기는 필요한 만큼만 진행)
+            k=heapq.merge(chan,srch,key=lambda v:-v["views"])
+        prev=days
+        start=len(picked)
         for v in k:
             if v["id"] in seen: continue
             picked.append(v);seen.add(v["id"]);log_pick(cat="story",video=v)
             if len(picked)>=10: break
+        # 검색 스트림 순서는 근사치(보강된 조회수 ≠ 검색 시점 조회수) → 이번 구간에서 뽑은 것만 다시 정렬
+        picked[start:]=sorted(picked[start:],key=lambda v:-v["views"])
         if len(picked)>=10: break
 
     top10=picked[:10]
     log_summary(cat="story",count=len(top10))
+    log_cache_stats(cat="story")
+    log_http_stats(cat="story")
+    log_quota_summary(cat="story")
 
     titles=[v["title"] for v in top10]
     tags=[v.get("tags",[]) for v in top10]
     kws=extract_top_keywords(titles,tags,topk=15)
     new=make_strong_titles_from_keywords(kws,n=10)
+    trend=top_keywords(15)
 
-    md=email_md(top10,kws,new,note)
+    md=email_md(top10,kws,new,note,trend)
     Path(REPORT_PATH).write_text(md,encoding="utf-8")
     send_email_markdown(md,"✅ 시니어 인생스토리 Top10 + 신규제목10")
 
 if __name__=="__main__":
-    main()
+    ap=argparse.ArgumentParser(description="시니어 인생스토리 일일 리포트")
+    ap.add_argument("--profile",action="store_true",help="cProfile 로 실행, data/outputs/profile-daily.pstats 저장")
+    if ap.parse_args().profile: profiled(main,"daily")
+    else: main()
@@ -1,33 +1,16 @@
-import os, smtplib
-from email.mime.text import MIMEText
+"""
+보내기함(data/outbox)에 남은 메일 발송 — python cli.py deliver 와 같다
+(예전 단독 SMTP 발송 코드는 utils.outbox 로 통합)
+"""
+from utils import emailer
 
-def send_email_markdown(md_text, subject="일일 스토리 리포트"):
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT") or "587")
-    user = os.getenv("SMTP_USER")
-    pwd  = os.getenv("SMTP_PASS")
-    to   = os.getenv("REPORT_EMAIL_TO")
-
-    # 값 점검 로그 (비번은 길이만)
-    print("SMTP ENV:",
-          "HOST=", host,
-          "PORT=", port,
-          "USER=", user,
-          "PASS_LEN=", len(pwd) if pwd else 0,
-          "TO=", to)
 
-    if not (host and port and user and pwd and to):
-        raise ValueError("SMTP 환경변수 누락: HOST/PORT/USER/PASS/TO 확인")
+def send_email_markdown(md_text, subject="일일 스토리 리포트"):
+    """예전 import 경로 호환 (subject 기본값 포함) → utils.emailer 로 발송."""
+    return emailer.send_email_markdown(md_text, subject)
 
-    msg = MIMEText(md_text, _subtype="plain", _charset="utf-8")
-    msg["Subject"] = subject
-    msg["From"] = user
-    msg["To"] = to
 
-    with smtplib.SMTP(host, port, timeout=30) as s:
-        s.set_debuglevel(1)   # 서버 응답 로그 보기
-        s.ehlo()
-        s.starttls()
-        s.ehlo()
-        s.login(user, pwd)    # ← 여기서 535면 아이디/앱비번/IMAP설정 문제
-        s.send_message(msg)
+if __name__ == "__main__":
+    from utils.outbox import deliver
+    sent, left = deliver()
+    print(f"보낸 메일 {sent}통")
@@ -0,0 +1,17 @@
+import os, sys, tempfile
+from pathlib import Path
+import pytest
+
+# utils.io 는 import 시 data/ 를 만든다 → 저장소를 더럽히지 않게 임시 디렉터리에서 실행
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(tempfile.mkdtemp(prefix="senior-tests-"))
+
+@pytest.fixture
+def fresh_store(tmp_path, monkeypatch):
+    """테스트마다 빈 영상 저장소."""
+    from utils import store
+    monkeypatch.setattr(store, "STORE_PATH", tmp_path / "videos.sqlite")
+    monkeypatch.setattr(store, "_conn", None)
+    yield store
+    if store._conn is not None: store._conn.close()
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+from utils import kwseries
+
+NOW = datetime(2026, 10, 17, 12, tzinfo=timezone.utc)
+
+def _rec(i, published, seen, title="국민연금 개편 총정리"):
+    return {"id": f"v{i}", "title": title, "desc": "", "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "firstSeen": seen.timestamp()}
+
+def test_late_discovered_old_videos_do_not_change_ratio(fresh_store):
+    # 이전 구간(8~14일 전) 영상 2개는 그때 발견, 이번 구간(최근 7일) 영상 4개
+    kwseries.ingest([_rec(i, NOW - timedelta(days=10), NOW - timedelta(days=9)) for i in range(2)])
+    kwseries.ingest([_rec(10 + i, NOW - timedelta(days=3), NOW - timedelta(days=2)) for i in range(4)])
+    cur, prev = kwseries.window_counts(7, NOW)
+    assert (cur["연금"], prev["연금"]) == (4, 2)
+
+    # 오늘 검색으로 뒤늦게 찾은 이전 구간 영상 5개 → 이전 구간 수는 그대로
+    kwseries.ingest([_rec(20 + i, NOW - timedelta(days=11), NOW) for i in range(5)])
+    assert kwseries.window_counts(7, NOW) == (cur, prev)
+
+def test_cold_start_counts_everything(fresh_store):
+    # 발견 기록이 전부 이번 구간 안이면 발견일 제한 없이 비교
+    kwseries.ingest([_rec(i, NOW - timedelta(days=10), NOW) for i in range(3)])
+    cur, prev = kwseries.window_counts(7, NOW)
+    assert prev["연금"] == 3 and "연금" not in cur
+
+def test_equal_daily_uploads_give_ratio_one(fresh_store):
+    # 14일 동안 매일 1개씩 (올린 날 발견) → 두 구간 모두 같은 날 수
+    kwseries.ingest([_rec(i, NOW - timedelta(days=i), NOW - timedelta(days=i)) for i in range(14)])
+    cur, prev = kwseries.window_counts(7, NOW)
+    assert cur["연금"] == prev["연금"] == 7
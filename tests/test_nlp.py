@@ -0,0 +1,17 @@
+import pytest
+from utils.nlp import strip_suffix, tokenize
+
+@pytest.mark.parametrize("word", ["어린이", "고양이", "김정은", "민주주의", "경기도", "무제한", "아이", "대한민국"])
+def test_nouns_ending_in_josa_letters_are_kept(word):
+    assert strip_suffix(word) == word
+
+@pytest.mark.parametrize("word, stem", [
+    ("가족이", "가족"), ("가족을", "가족"), ("가족의", "가족"), ("며느리에게는", "며느리"),
+    ("어머니께서", "어머니"), ("공개했다", "공개"), ("재혼이었다", "재혼"), ("행복한", "행복"),
+    ("어린이에게", "어린이"), ("고양이를", "고양이"),
+])
+def test_particles_and_endings_are_stripped(word, stem):
+    assert strip_suffix(word) == stem
+
+def test_tokenize_merges_particle_variants():
+    assert tokenize("[사연] 가족이 무너진 날, 가족을 지킨 고양이") == ["사연", "가족", "무너진", "가족", "지킨", "고양이"]
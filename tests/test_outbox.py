@@ -0,0 +1,41 @@
+import re
+from email.message import EmailMessage
+from utils import outbox
+
+
+def _msg():
+    msg = EmailMessage()
+    msg["Subject"] = "주간 리포트"
+    msg["From"] = "bot@example.com"
+    msg["To"] = "me@example.com"
+    msg.set_content("첫 줄\n둘째 줄\n", charset="utf-8", cte="base64")
+    return msg
+
+
+def test_enqueue_writes_crlf(tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_DIR", tmp_path)
+    data = outbox.enqueue(_msg()).read_bytes()
+    assert b"\r\n" in data
+    assert not re.search(rb"(?<!\r)\n", data)
+
+
+def test_envelope_upgrades_lf_spool(tmp_path):
+    old = tmp_path / "old.eml"
+    old.write_bytes(_msg().as_bytes())   # 예전 enqueue 형식 (LF)
+    sender, rcpts, data = outbox._envelope(old, "fallback@example.com")
+    assert (sender, rcpts) == ("bot@example.com", ["me@example.com"])
+    assert not re.search(rb"(?<!\r)\n", data)
+
+
+def test_connect_without_starttls_continues(monkeypatch):
+    import smtplib
+
+    class NoTLS:
+        def __init__(self, *a, **kw): self.calls = []
+        def ehlo(self): self.calls.append("ehlo")
+        def starttls(self, **kw): raise smtplib.SMTPNotSupportedError("STARTTLS extension not supported by server.")
+        def login(self, user, pwd): self.calls.append("login")
+
+    monkeypatch.setattr(smtplib, "SMTP", NoTLS)
+    s = outbox._connect("mail", 587, "u", "p", use_ssl=False, use_tls=True)
+    assert s.calls == ["ehlo", "login"]
@@ -0,0 +1,120 @@
+import os, json, time, sqlite3, threading
+from pathlib import Path
+from .io import log_event
+
+# YouTube Data API 응답 디스크 캐시 (main/weekly/monthly 공용)
+# + 조건부 GET 검증자(ETag/Last-Modified)와 본문 (뉴스 피드 등)
+CACHE_PATH     = Path(os.getenv("YT_CACHE_PATH", "data/cache/youtube.sqlite"))
+CACHE_ENABLED  = os.getenv("YT_CACHE", "1") != "0"
+CACHE_MAX_ROWS = int(os.getenv("YT_CACHE_MAX_ROWS", "5000"))
+VALIDATOR_KEEP_DAYS = 30
+
+# 엔드포인트별 TTL(초): 통계(조회수)는 짧게, 스니펫(제목/태그/길이)은 길게
+TTL = {
+    "search":        int(os.getenv("YT_CACHE_TTL_SEARCH", str(6*3600))),
+    "videos:stats":  int(os.getenv("YT_CACHE_TTL_STATS", str(3600))),
+    "videos":        int(os.getenv("YT_CACHE_TTL_SNIPPET", str(7*24*3600))),
+}
+DEFAULT_TTL = 3600
+
+# 키 정규화에서 제외(인증키) / 시간 단위로 자르는 파라미터
+_DROP_PARAMS = {"key"}
+_TIME_PARAMS = {"publishedAfter", "publishedBefore"}
+
+_lock = threading.Lock()
+_conn = None
+STATS = {}   # endpoint -> {"hit": n, "miss": n}
+
+def _db():
+    global _conn
+    if _conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(CACHE_PATH), check_same_thread=False)
+        _conn.execute("""CREATE TABLE IF NOT EXISTS responses(
+            key TEXT PRIMARY KEY, endpoint TEXT, body TEXT,
+            created REAL, accessed REAL)""")
+        _conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses(accessed)")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS validators(
+            key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_type TEXT, body BLOB, updated REAL)""")
+        _conn.commit()
+    return _conn
+
+def _ttl_key(endpoint: str, params: dict):
+    if endpoint == "videos" and "statistics" in str(params.get("part", "")):
+        return "videos:stats"
+    return endpoint
+
+def ttl_for(endpoint: str, params: dict) -> int:
+    return TTL.get(_ttl_key(endpoint, params), DEFAULT_TTL)
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """엔드포인트 + 정규화된 파라미터. 시각 파라미터는 시(hour) 단위로 잘라 같은 실행대 요청을 묶는다."""
+    norm = {}
+    for k, v in (params or {}).items():
+        if k in _DROP_PARAMS or v is None: continue
+        v = str(v)
+        if k in _TIME_PARAMS: v = v[:13]   # YYYY-MM-DDTHH
+        if k == "id": v = ",".join(sorted(v.split(",")))
+        norm[k] = v
+    return endpoint + "?" + json.dumps(norm, sort_keys=True, ensure_ascii=False)
+
+def _count(endpoint: str, kind: str):
+    s = STATS.setdefault(endpoint, {"hit": 0, "miss": 0})
+    s[kind] += 1
+
+def cache_get(endpoint: str, params: dict):
+    if not CACHE_ENABLED: return None
+    key = cache_key(endpoint, params)
+    now = time.time()
+    with _lock:
+        row = _db().execute("SELECT body, created FROM responses WHERE key=?", (key,)).fetchone()
+        if not row or now - row[1] > ttl_for(endpoint, params):
+            _count(endpoint, "miss")
+            return None
+        _db().execute("UPDATE responses SET accessed=? WHERE key=?", (now, key))
+        _db().commit()
+        _count(endpoint, "hit")
+    return json.loads(row[0])
+
+def cache_put(endpoint: str, params: dict, data):
+    if not CACHE_ENABLED: return
+    key = cache_key(endpoint, params)
+    now = time.time()
+    with _lock:
+        db = _db()
+        db.execute("INSERT OR REPLACE INTO responses(key, endpoint, body, created, accessed) VALUES(?,?,?,?,?)",
+                   (key, endpoint, json.dumps(data, ensure_ascii=False), now, now))
+        # 크기 제한: 가장 오래 안 쓰인 항목부터 제거(LRU)
+        n = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if n > CACHE_MAX_ROWS:
+            db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                       (n - CACHE_MAX_ROWS,))
+        db.commit()
+
+def validator_get(key: str):
+    """조건부 GET 용 (etag, last_modified, content_type, body) 또는 None."""
+    if not CACHE_ENABLED: return None
+    with _lock:
+        return _db().execute("SELECT etag, last_modified, content_type, body FROM validators WHERE key=?",
+                             (key,)).fetchone()
+
+def validator_put(key: str, etag, last_modified, content_type, body: bytes):
+    if not CACHE_ENABLED: return
+    now = time.time()
+    with _lock:
+        db = _db()
+        db.execute("INSERT OR REPLACE INTO validators(key, etag, last_modified, content_type, body, updated) VALUES(?,?,?,?,?,?)",
+                   (key, etag, last_modified, content_type, body, now))
+        db.execute("DELETE FROM validators WHERE updated < ?", (now - VALIDATOR_KEEP_DAYS * 86400,))
+        db.commit()
+
+def count_conditional(hit: bool):
+    with _lock:
+        _count("conditional", "hit" if hit else "miss")
+
+def log_cache_stats(cat: str = None):
+    """실행 종료 시 엔드포인트별 hit/miss 를 런 로그에 남긴다."""
+    for ep, s in sorted(STATS.items()):
+        total = s["hit"] + s["miss"]
+        log_event("cache", cat=cat, endpoint=ep, hit=s["hit"], miss=s["miss"],
+                  note=f"{ep} hit {s['hit']}/{total}")
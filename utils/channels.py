@@ -0,0 +1,88 @@
+import re
+from urllib.parse import unquote
+from datetime import timezone
+from .io import load_yaml, log_event, log_warn
+from .youtube import YOUTUBE_API_KEY, api_get, hydrate, _cutoff
+from .quota import QuotaExceeded
+from . import store
+
+# config/anchors.yaml 의 기준 채널을 업로드 재생목록(playlistItems, 1단위)으로 증분 동기화
+ANCHORS_PATH = "config/anchors.yaml"
+SYNC_MAX_PAGES = 4    # 첫 동기화 시 채널당 최대 200개
+
+def load_anchors(path: str = ANCHORS_PATH):
+    """{cat: {"channels": [...], "videos": [...]}}"""
+    data = load_yaml(path) or {}
+    return {cat: {"channels": (v or {}).get("channels") or [], "videos": (v or {}).get("videos") or []}
+            for cat, v in data.items()}
+
+def _resolve(ref: str, priority: str = "normal"):
+    """채널 URL/핸들 → (channel_id, uploads 재생목록). 한 번 해석하면 저장소에 캐시."""
+    hit = store.get_channel(ref)
+    if hit: return hit["channel_id"], hit["uploads"]
+    m = re.search(r"/channel/(UC[\w-]+)", ref)
+    if m:
+        cid = m.group(1)
+        uploads = "UU" + cid[2:]     # 업로드 재생목록 규칙 → API 호출 불필요
+    else:
+        m = re.search(r"/@([^/?#]+)", ref)
+        if not m:
+            log_warn(f"anchor 채널 형식 인식 불가: {ref}"); return None, None
+        data = api_get("channels", {"key": YOUTUBE_API_KEY, "part": "contentDetails",
+                                     "forHandle": "@" + unquote(m.group(1))}, priority=priority)
+        items = data.get("items", [])
+        if not items:
+            log_warn(f"anchor 채널 없음: {ref}"); return None, None
+        cid = items[0]["id"]
+        uploads = items[0].get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads") or "UU" + cid[2:]
+    store.save_channel(ref, cid, uploads)
+    return cid, uploads
+
+def sync_channel(ref: str, max_pages: int = SYNC_MAX_PAGES, priority: str = "normal"):
+    """커서(마지막으로 본 게시 시각)보다 새 업로드만 받아 저장. 새 videoId 목록 반환."""
+    cid, uploads = _resolve(ref, priority)
+    if not uploads: return []
+    cursor = (store.get_channel(ref) or {}).get("cursor")
+    params = {"key": YOUTUBE_API_KEY, "part": "contentDetails", "playlistId": uploads, "maxResults": 50}
+    pairs = []
+    page = None
+    for _ in range(max_pages):
+        if page: params["pageToken"] = page
+        data = api_get("playlistItems", params, priority=priority)
+        done = False
+        for it in data.get("items", []):
+            cd = it.get("contentDetails", {})
+            vid, pub = cd.get("videoId"), cd.get("videoPublishedAt")
+            if not (vid and pub): continue
+            if cursor and pub <= cursor:   # 업로드 재생목록은 최신순 → 커서 도달 시 중단
+                done = True; break
+            pairs.append((vid, pub))
+        page = data.get("nextPageToken")
+        if done or not page: break
+    store.add_channel_videos(ref, pairs, cursor=max((p for _, p in pairs), default=None))
+    return [vid for vid, _ in pairs]
+
+def sync_anchor_channels(cat: str = "story", priority: str = "normal"):
+    """cat 의 앵커 채널 전부 동기화. 실패한 채널은 건너뛴다."""
+    import requests
+    refs = load_anchors().get(cat, {}).get("channels", [])
+    total = 0
+    for ref in refs:
+        try:
+            total += len(sync_channel(ref, priority=priority))
+        except QuotaExceeded:
+            break
+        except requests.RequestException as e:
+            log_warn(f"anchor 채널 동기화 실패: {ref} ({e})")
+    log_event("channel_sync", cat=cat, count=total, note=f"{len(refs)} channels")
+    return refs
+
+def channel_candidates(refs, days, until_days=0, now=None):
+    """동기화된 앵커 채널 업로드 중 [days일 전, until_days일 전) 구간 → 상세 보강 레코드, 조회수 내림차순."""
+    since = _cutoff(days, now).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    recs = hydrate(store.channel_video_ids(refs, since=since))
+    if until_days:
+        until = _cutoff(until_days, now).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        recs = [r for r in recs if (r.get("publishedAt") or "") < until]
+    recs.sort(key=lambda x: x["views"], reverse=True)
+    return recs
@@ -0,0 +1,128 @@
+import os, csv, json, bisect
+from pathlib import Path
+from datetime import datetime
+from .io import log_info, log_warn
+from . import rollup
+from .trace import span
+
+# 주간 스냅샷 히스토리: 날짜(YYYYMMDD) 파티션 1개 = 주 1회, 추가 전용
+# - 파티션 파일: 테이블별 열(column) 배열, 스키마 타입으로 저장 → 읽을 때 문자열 재파싱 없음
+# - _index.json: 정렬된 파티션 날짜 목록 → 기간 조회 시 해당 파티션만 연다
+STORE_DIR = Path(os.getenv("HISTORY_STORE_DIR", "data/history_store"))
+INDEX_PATH = STORE_DIR / "_index.json"
+
+SCHEMAS = {
+    "topics": {"topic": str, "example_title": str, "example_url": str, "views": int, "channel": str},
+    "top5": {"rank": int, "title": str, "url": str, "views": int, "channel": str},
+    "rising": {"keyword": str, "current_count": int, "previous_count": int, "delta": int, "change_pct": float,
+               "rep_title": str, "rep_url": str, "rep_views": int, "rep_channel": str},
+    "competition": {"archetype": str, "uploads": int, "top_hits": int, "top_ratio": float, "difficulty": str},
+    "title_patterns": {"ratio_number": float, "ratio_brackets": float, "ratio_exclaim": float,
+                       "ratio_shocking": float, "avg_len_char": float, "avg_len_word": float},
+}
+# 기존 주간 CSV 파일명 ↔ 테이블
+CSV_FILES = {
+    "topics": "weekly_topics.csv",
+    "top5": "weekly_top5_videos.csv",
+    "rising": "weekly_rising_keywords.csv",
+    "competition": "weekly_archetype_competition.csv",
+    "title_patterns": "weekly_title_patterns.csv",
+}
+
+def _cast(typ, x):
+    if x is None or x == "": return None
+    try: return typ(float(x)) if typ is int else typ(x)
+    except (TypeError, ValueError): return None
+
+def _to_columns(table, rows):
+    schema = SCHEMAS[table]
+    return {col: [_cast(typ, r.get(col)) for r in rows] for col, typ in schema.items()}
+
+def _to_rows(cols):
+    names = list(cols)
+    n = len(cols[names[0]]) if names else 0
+    return [{c: cols[c][i] for c in names} for i in range(n)]
+
+def _load_index():
+    try:
+        return json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        return []
+
+def _atomic_write(path: Path, text: str):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+def partitions(since: str = None, until: str = None):
+    """[since, until] (YYYYMMDD) 에 드는 파티션 날짜 (오름차순)."""
+    idx = _load_index()
+    lo = bisect.bisect_left(idx, since) if since else 0
+    hi = bisect.bisect_right(idx, until) if until else len(idx)
+    return idx[lo:hi]
+
+def has_partition(stamp: str) -> bool:
+    return (STORE_DIR / f"{stamp}.json").exists()
+
+@span("history.write")
+def write_week(stamp: str, tables: dict, overwrite: bool = True):
+    """주간 스냅샷 한 번에 기록. tables: {테이블: [row dict, ...]}"""
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    path = STORE_DIR / f"{stamp}.json"
+    if path.exists() and not overwrite: return False
+    data = {"date": stamp, "tables": {t: _to_columns(t, rows) for t, rows in tables.items() if t in SCHEMAS}}
+    _atomic_write(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    idx = _load_index()
+    if stamp not in idx:
+        bisect.insort(idx, stamp)
+        _atomic_write(INDEX_PATH, json.dumps(idx))
+    rollup.update_week(stamp, tables)    # 주 → 월 → 분기 → 연 사전 집계 갱신
+    return True
+
+def read_partition(stamp: str):
+    """{테이블: [row dict, ...]}"""
+    try:
+        data = json.loads((STORE_DIR / f"{stamp}.json").read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    return {t: _to_rows(cols) for t, cols in data.get("tables", {}).items()}
+
+def read_range(since: str = None, until: str = None, tables=None):
+    """기간 내 파티션만 읽어 테이블별로 이어붙인다. 각 행에 week(YYYYMMDD) 포함."""
+    out = {t: [] for t in (tables or SCHEMAS)}
+    for stamp in partitions(since, until):
+        for t, rows in read_partition(stamp).items():
+            if t not in out: continue
+            for r in rows:
+                r["week"] = stamp
+            out[t] += rows
+    return out
+
+def import_csv_history(hist_dir: Path, overwrite: bool = False):
+    """기존 data/history/YYYYMMDD/*.csv → 파티션. 이미 있는 날짜는 건너뛴다."""
+    n = 0
+    for p in sorted(Path(hist_dir).glob("*")):
+        if not p.is_dir(): continue
+        try:
+            datetime.strptime(p.name, "%Y%m%d")
+        except ValueError:
+            continue
+        if has_partition(p.name) and not overwrite: continue
+        tables = {}
+        for t, fname in CSV_FILES.items():
+            f = p / fname
+            if not f.exists(): continue
+            try:
+                with f.open(encoding="utf-8-sig") as fp:
+                    tables[t] = list(csv.DictReader(fp))
+            except Exception as e:
+                log_warn(f"history CSV 읽기 실패: {f} ({e})")
+        if tables and write_week(p.name, tables, overwrite=overwrite):
+            n += 1
+    if n: log_info(f"history: CSV 히스토리 {n}주 가져옴")
+    return n
+
+if __name__ == "__main__":
+    # python -m utils.history [data/history] — 예전 CSV 히스토리 일괄 가져오기
+    import sys
+    print(import_csv_history(Path(sys.argv[1] if len(sys.argv) > 1 else "data/history")))
@@ -0,0 +1,105 @@
+import os, time, heapq, threading
+from .nlp import tokenize_many
+from . import store
+
+# 키워드 heavy hitter: 모든 작업에서 처음 본 영상의 제목+태그 토큰을 흘려 넣는 Space-Saving 요약
+# - 항목 수는 CAPACITY 로 고정 (메모리/저장소 크기 일정), 실제 빈도 ≥ 전체/CAPACITY 인 토큰은 빠지지 않는다
+# - 시간 감쇠: 반감기 HALF_LIFE_DAYS. 전진 감쇠(forward decay) → 새 항목일수록 큰 가중치로 더하고
+#   조회 시점에 한 번 나눈다 (기존 항목을 매번 깎지 않는다, 순서는 시간에 따라 바뀌지 않음)
+# - 저장소(kw_heavy)에 바뀐 항목만 flush() 로 기록, 다음 실행이 이어서 쌓는다
+CAPACITY       = int(os.getenv("KW_HH_CAPACITY", "2000"))
+HALF_LIFE_DAYS = float(os.getenv("KW_HH_HALF_LIFE_DAYS", "14"))
+_RESCALE_EXP   = 40.0     # 가중치 지수가 이만큼 커지면 landmark 를 당겨 전체를 다시 눈금 맞춤
+
+_lock = threading.Lock()
+_state = None
+
+class _State:
+    def __init__(self, landmark, entries):
+        self.landmark = landmark
+        self.entries = {t: [c, e] for t, (c, e) in entries.items()}   # token → [count, err] (landmark 눈금)
+        self.heap = [(c, t) for t, (c, e) in self.entries.items()]    # 최소 힙, 오래된 값은 꺼낼 때 버린다
+        heapq.heapify(self.heap)
+        self.dirty, self.removed = set(), set()
+
+def _load():
+    global _state
+    if _state is None:
+        landmark, entries = store.load_heavy_hitters()
+        _state = _State(landmark if landmark is not None else time.time(), entries)
+    return _state
+
+def _exp(st, now):
+    return (now - st.landmark) / (HALF_LIFE_DAYS * 86400)
+
+def _rescale(st, now):
+    f = 2.0 ** -_exp(st, now)
+    for v in st.entries.values():
+        v[0] *= f; v[1] *= f
+    st.heap = [(v[0], t) for t, v in st.entries.items()]
+    heapq.heapify(st.heap)
+    st.landmark = now
+    st.dirty.update(st.entries)
+
+def _pop_min(st):
+    while True:
+        c, t = heapq.heappop(st.heap)
+        v = st.entries.get(t)
+        if v is not None and v[0] == c: return t, v
+
+def _add(st, tok, w):
+    v = st.entries.get(tok)
+    if v is None:
+        if len(st.entries) >= CAPACITY:
+            old, (c_min, _) = _pop_min(st)
+            del st.entries[old]
+            st.dirty.discard(old); st.removed.add(old)
+            v = st.entries[tok] = [c_min, c_min]     # 밀어낸 항목의 카운트를 물려받는다 (과대추정 상한 = err)
+        else:
+            v = st.entries[tok] = [0.0, 0.0]
+        st.removed.discard(tok)
+    v[0] += w
+    st.dirty.add(tok)
+    heapq.heappush(st.heap, (v[0], tok))
+    if len(st.heap) > 4 * CAPACITY:
+        st.heap = [(v[0], t) for t, v in st.entries.items()]
+        heapq.heapify(st.heap)
+
+def ingest(records, now=None):
+    """영상 레코드들 → 영상마다 (제목+태그) 토큰 집합을 1씩 더한다."""
+    now = now or time.time()
+    docs = []
+    for r in records:
+        texts = [r.get("title") or ""] + list(r.get("tags") or [])
+        docs.append(set().union(*tokenize_many(texts)))
+    with _lock:
+        st = _load()
+        if _exp(st, now) > _RESCALE_EXP: _rescale(st, now)
+        w = 2.0 ** _exp(st, now)
+        for toks in docs:
+            for tok in toks: _add(st, tok, w)
+    return len(docs)
+
+def flush():
+    """바뀐 항목만 저장소에 기록."""
+    with _lock:
+        st = _state
+        if st is None or not (st.dirty or st.removed): return 0
+        ups = [(t, *st.entries[t]) for t in st.dirty]
+        store.save_heavy_hitters(st.landmark, ups, list(st.removed))
+        st.dirty, st.removed = set(), set()
+    return len(ups)
+
+def top(k: int = 20, now=None, guaranteed: bool = False):
+    """현재 시점 감쇠 카운트 상위 k → [(token, count, err)] (count-err 는 보장 하한).
+    guaranteed=True: 보장 하한 순 (밀려났다 돌아온 잡음 토큰이 위로 오지 않는다)."""
+    now = now or time.time()
+    key = (lambda kv: (kv[1][0] - kv[1][1], kv[0])) if guaranteed else (lambda kv: (kv[1][0], kv[0]))
+    with _lock:
+        st = _load()
+        f = 2.0 ** -_exp(st, now)
+        best = heapq.nlargest(k, st.entries.items(), key=key)
+    return [(t, c * f, e * f) for t, (c, e) in best]
+
+def top_keywords(k: int = 15, now=None):
+    return [t for t, c, e in top(k, now, guaranteed=True) if c > e]
@@ -0,0 +1,134 @@
+import os, time, random, threading
+from urllib.parse import urlsplit
+from .io import log_event, log_warn
+from . import replay
+from .trace import span
+
+# 공용 HTTP 클라이언트: 커넥션 풀 + keep-alive + 지터 지수 백오프 재시도
+# requests 는 첫 요청 때 import (import 만 ~80ms, 히스토리만 읽는 작업은 안 씀)
+HTTP_RETRIES   = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF   = float(os.getenv("HTTP_BACKOFF", "0.5"))     # 첫 대기(초), 시도마다 2배
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 지연 히스토그램 구간(ms 상한)
+BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, float("inf")]
+
+_session = None
+_lock = threading.Lock()
+STATS = {}   # host -> {"count","retries","errors","hist":[...]}
+
+def session():
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+    return _session
+
+def _record(host: str, ms: float, retried: bool, failed: bool):
+    with _lock:
+        s = STATS.setdefault(host, {"count": 0, "retries": 0, "errors": 0, "hist": [0]*len(BUCKETS_MS)})
+        s["count"] += 1
+        if retried: s["retries"] += 1
+        if failed: s["errors"] += 1
+        for i, ub in enumerate(BUCKETS_MS):
+            if ms <= ub:
+                s["hist"][i] += 1; break
+
+def _backoff(attempt: int, retry_after=None) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), HTTP_BACKOFF_MAX)
+        except ValueError:
+            pass
+    base = min(HTTP_BACKOFF * (2 ** attempt), HTTP_BACKOFF_MAX)
+    return random.uniform(0, base)   # full jitter
+
+def _fits(delay: float, deadline) -> bool:
+    return deadline is None or time.monotonic() + delay < deadline
+
+def http_get(url: str, params: dict = None, timeout: float = 30, headers: dict = None, retries: int = None,
+             deadline: float = None, **kw):
+    """
+    GET + 재시도(5xx/429/연결 끊김). 재시도를 다 써도 실패하면 마지막 응답을 그대로 돌려주거나 예외를 올린다.
+    deadline(time.monotonic() 기준 절대 시각): 시도별 timeout 을 남은 시간으로 줄이고, 대기가 마감을 넘기면 재시도하지 않는다.
+    """
+    import requests
+    retries = HTTP_RETRIES if retries is None else retries
+    u = urlsplit(url)
+    host = u.netloc
+    with span("http", host=host, path=u.path) as sp:
+        for attempt in range(retries + 1):
+            sp.set(attempts=attempt + 1)
+            left = None if deadline is None else deadline - time.monotonic()
+            if left is not None and left <= 0:
+                raise requests.Timeout(f"deadline exceeded: {host}")
+            t0 = time.perf_counter()
+            try:
+                r = session().get(url, params=params, timeout=min(timeout, left) if left else timeout,
+                                  headers=headers, **kw)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                _record(host, (time.perf_counter()-t0)*1000, attempt > 0, True)
+                delay = _backoff(attempt)
+                if attempt >= retries or not _fits(delay, deadline): raise
+                log_warn(f"http retry {host} ({type(e).__name__})", attempt=attempt+1)
+                time.sleep(delay)
+                continue
+            failed = r.status_code in RETRY_STATUS
+            _record(host, (time.perf_counter()-t0)*1000, attempt > 0, failed)
+            delay = _backoff(attempt, r.headers.get("Retry-After")) if failed else 0
+            if not failed or attempt >= retries or not _fits(delay, deadline):
+                sp.set(status=r.status_code)
+                replay.record(url, params, r)    # HTTP_RECORD_DIR 설정 시 픽스처로 저장
+                return r
+            log_warn(f"http retry {host} status={r.status_code}", attempt=attempt+1)
+            time.sleep(delay)
+
+def conditional_get(url: str, params: dict = None, timeout: float = 30, headers: dict = None, **kw):
+    """
+    ETag/Last-Modified 조건부 GET (utils.cache 에 검증자+본문 저장).
+    304 면 저장된 본문으로 만든 200 응답을 돌려준다 (r.from_cache = True).
+    stream=True 면 본문을 읽지 않고 돌려준다 → 호출자가 읽은 만큼 r.remember(body) 로 저장
+    (일찍 끊어 읽는 파서는 자기가 쓴 앞부분만 저장하고, 304 때 그 앞부분을 다시 파싱한다).
+    """
+    import requests
+    from .cache import validator_get, validator_put, count_conditional
+    key = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()) if k not in ("key", "apiKey"))
+    old = validator_get(key)
+    h = dict(headers or {})
+    if old:
+        if old[0]: h["If-None-Match"] = old[0]
+        if old[1]: h["If-Modified-Since"] = old[1]
+    r = http_get(url, params=params, timeout=timeout, headers=h, **kw)
+    if r.status_code == 304 and old:
+        count_conditional(True)
+        r.close()
+        cached = requests.Response()
+        cached.status_code, cached.url, cached._content = 200, r.url, old[3]
+        cached._content_consumed = True    # iter_content 가 저장된 본문을 잘라서 내준다
+        cached.headers["Content-Type"] = old[2] or ""
+        cached.from_cache = True
+        cached.remember = lambda body: None
+        return cached
+    count_conditional(False)
+    etag, lm = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    ok = r.status_code == 200 and (etag or lm)
+    r.remember = lambda body: validator_put(key, etag, lm, r.headers.get("Content-Type"), body) if ok else None
+    if not kw.get("stream"): r.remember(r.content)
+    r.from_cache = False
+    return r
+
+def log_http_stats(cat: str = None):
+    """호스트별 호출 수/재시도/지연 히스토그램을 런 로그에 남긴다."""
+    labels = [f"<={int(b)}ms" if b != float("inf") else ">5000ms" for b in BUCKETS_MS]
+    for host, s in sorted(STATS.items()):
+        hist = {lb: n for lb, n in zip(labels, s["hist"]) if n}
+        log_event("http", cat=cat, host=host, calls=s["count"], retries=s["retries"], errors=s["errors"],
+                  hist=hist, note=f"{host} calls={s['count']} retries={s['retries']}")
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-import os, json, uuid
+import os, sys, json, time, uuid, queue, atexit, threading
+from functools import lru_cache
 
 # 디렉토리
 LOG_DIR = Path("data/logs")
@@ -11,38 +12,132 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)
 # 설정
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()    # DEBUG/INFO/WARN/ERROR
 LOG_JSON  = os.getenv("LOG_JSON", "1") == "1"
+LOG_SYNC  = os.getenv("LOG_SYNC", "0") == "1"         # 디버깅용: 호출 스레드에서 바로 기록
+LOG_BATCH = int(os.getenv("LOG_BATCH", "256"))        # 백그라운드 기록 1회 최대 줄 수
 TZ = timezone(timedelta(hours=9))
 LEVEL_MAP = {"DEBUG":10, "INFO":20, "WARN":30, "ERROR":40}
 
+# 프로세스당 하나로 고정되는 실행 ID
+RUN_ID = os.getenv("RUN_ID") or uuid.uuid4().hex
+
 def now_kst():
     return datetime.now(TZ)
 
 def _enabled(level: str) -> bool:
     return LEVEL_MAP.get(level, 20) >= LEVEL_MAP.get(LOG_LEVEL, 20)
 
-def _files():
-    day = now_kst().strftime("%Y%m%d")
+def _files(day: str = None):
+    day = day or now_kst().strftime("%Y%m%d")
     text_file = LOG_DIR / f"run-{day}.log"
     json_file = LOG_DIR / f"run-{day}.jsonl"
     return text_file, json_file
 
+# ---- 기록기: 파일을 열어둔 채 큐에 쌓인 줄을 묶어서 기록 ----
+class _LogWriter:
+    def __init__(self, sync: bool):
+        self.sync = sync
+        self._fps = {}          # (day, kind) -> file
+        self._lock = threading.Lock()
+        self._q = None
+        self._thread = None
+        if not sync:
+            self._q = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _fp(self, day: str, kind: int):
+        fp = self._fps.get((day, kind))
+        if fp is None:
+            # 날짜가 바뀌면 이전 날짜 파일은 닫는다
+            for key in [k for k in self._fps if k[0] != day]:
+                self._fps.pop(key).close()
+            fp = _files(day)[kind].open("a", encoding="utf-8")
+            self._fps[(day, kind)] = fp
+        return fp
+
+    def _write(self, batch):
+        with self._lock:
+            touched = set()
+            for day, kind, line in batch:
+                fp = self._fp(day, kind)
+                fp.write(line); touched.add(fp)
+            for fp in touched: fp.flush()
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            batch, stop = [], item is None
+            if not stop: batch.append(item)
+            while not stop and len(batch) < LOG_BATCH:
+                try: item = self._q.get_nowait()
+                except queue.Empty: break
+                if item is None: stop = True
+                else: batch.append(item)
+            try:
+                if batch: self._write(batch)
+            except Exception as e:
+                self._salvage(batch, e)
+            finally:
+                # 기록이 실패해도 task_done 은 반드시 → flush_logs() 가 멈추지 않는다
+                for _ in range(len(batch) + (1 if stop else 0)): self._q.task_done()
+            if stop: return
+
+    def _salvage(self, batch, err):
+        # 묶음 기록 실패(디스크 오류 등): 한 줄씩 다시, 그래도 안 되는 줄은 버리고 stderr 에 알림
+        lost = 0
+        for rec in batch:
+            try: self._write([rec])
+            except Exception: lost += 1
+        if lost:
+            print(f"[log-writer] 로그 {lost}줄 기록 실패: {type(err).__name__}: {err}", file=sys.stderr)
+
+    def put(self, day: str, kind: int, line: str):
+        if self.sync: self._write([(day, kind, line)])
+        else: self._q.put((day, kind, line))
+
+    def flush(self, timeout: float = 10):
+        if self._q is None: return
+        # 기록 스레드가 죽었으면 기다리지 않는다 (join() 은 영원히 막힐 수 있다)
+        end = time.monotonic() + timeout
+        with self._q.all_tasks_done:
+            while self._q.unfinished_tasks and self._thread.is_alive():
+                left = end - time.monotonic()
+                if left <= 0: break
+                self._q.all_tasks_done.wait(min(left, 0.1))
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(None)
+            self._thread.join(timeout=10)
+        with self._lock:
+            for fp in self._fps.values(): fp.close()
+            self._fps.clear()
+
+_writer = _LogWriter(LOG_SYNC)
+
+def flush_logs():
+    """큐에 쌓인 로그를 모두 기록할 때까지 대기."""
+    _writer.flush()
+
 def log_line(level: str, msg: str):
     if not _enabled(level): return
-    ts = now_kst().strftime("%Y-%m-%d %H:%M:%S")
-    line = f"[{ts}][{level}] {msg}\n"
+    now = now_kst()
+    line = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}][{level}] {msg}\n"
     print(line, end="")
-    text_file, _ = _files()
-    with text_file.open("a", encoding="utf-8") as fp:
-        fp.write(line)
+    _writer.put(now.strftime("%Y%m%d"), 0, line)
+
+def log_record(event: str, **fields):
+    """JSONL 에만 기록 (콘솔 요약 없음, 레벨 무관). trace span 등 기계용 레코드."""
+    if not LOG_JSON: return
+    now = now_kst()
+    rec = {"ts": now.isoformat(), "event": event, "run_id": RUN_ID}
+    rec.update(fields)
+    _writer.put(now.strftime("%Y%m%d"), 1, json.dumps(rec, ensure_ascii=False) + "\n")
 
 def log_event(event: str, **fields):
     if not _enabled("INFO"): return
-    _, json_file = _files()
-    rec = {"ts": now_kst().isoformat(), "event": event, "run_id": os.getenv("RUN_ID") or str(uuid.uuid4())}
-    rec.update(fields or {})
-    if LOG_JSON:
-        with json_file.open("a", encoding="utf-8") as fp:
-            fp.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    log_record(event, **fields)
     # 콘솔 요약
     summary_keys = ("cat","reason","id","title","views","dur","step","days","count","note")
     summary = " ".join(f"{k}={fields.get(k)}" for k in summary_keys if fields.get(k) is not None)
@@ -101,10 +196,15 @@ def log_pick(cat:str=None, video:dict=None, step:int=None):
 
 # 설정 로드
 def load_yaml(path: str):
-    import yaml
+    """경로+수정시각 기준으로 프로세스 안에서 한 번만 파싱 (cli all 에서 작업 간 공유). 반환값은 수정하지 말 것."""
     p = Path(path)
     if not p.exists(): return {}
-    with p.open(encoding="utf-8") as fp:
+    return _read_yaml(str(p.resolve()), p.stat().st_mtime_ns)
+
+@lru_cache(maxsize=32)
+def _read_yaml(path: str, mtime_ns: int):
+    import yaml
+    with open(path, encoding="utf-8") as fp:
         return yaml.safe_load(fp) or {}
 
 # 과거 코드 호환용 단일 함수
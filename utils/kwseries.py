@@ -0,0 +1,50 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from . import topics
+from . import store
+
+# 키워드 일별 시계열: 어떤 작업이든 처음 저장소에 들어온 영상을 (게시일, 발견일)(UTC) 기준으로 적재
+# → 급상승 키워드를 추가 API 호출 없이 임의 구간(7v7, 14v14, 28v28)으로 계산
+# 각 구간은 그 구간이 끝난 시점까지 발견한 영상만 센다: 나중에 발견된 옛 영상이 이전 구간만
+# 계속 불려서 비율이 아래로 치우치지 않도록 (이번 구간도 끝난 시점 = 지금까지 본 것)
+
+def _text(r):
+    return f"{r.get('title') or ''} {r.get('desc') or ''}"
+
+def ingest(records):
+    """새로 본 영상 레코드들 → (게시일, 발견일, 키워드) 카운트 누적. 영상당 키워드 1회."""
+    counts = Counter()
+    today = _day(datetime.now(timezone.utc))
+    for r in records:
+        day = (r.get("publishedAt") or "")[:10]
+        if not day: continue
+        seen = _day(datetime.fromtimestamp(r["firstSeen"], timezone.utc)) if r.get("firstSeen") else today
+        for k in topics.KEYWORD_MATCHER.labels(_text(r)):
+            counts[(day, seen, k)] += 1
+    store.add_keyword_counts(counts)
+    return len(counts)
+
+def rebuild():
+    """키워드 사전이 바뀌었을 때: 저장소 전체 영상으로 시계열 재계산."""
+    store.clear_keyword_counts()
+    return ingest(store.records_published(""))
+
+def _day(dt):
+    return dt.strftime("%Y-%m-%d")
+
+def window_counts(days: int, now=None):
+    """(최근 days일, 그 전 days일) 키워드별 업로드 수. 이전 구간은 이번 구간 시작 전에 발견한 영상만.
+    두 구간 모두 날짜 경계로 자른 days일씩 (이번 구간 = 오늘 포함 최근 days일)."""
+    now = now or datetime.now(timezone.utc)
+    end = now + timedelta(days=1)
+    cut = end - timedelta(days=days)
+    prev = end - timedelta(days=2*days)
+    n, first_seen, videos = store.keyword_series_state()
+    if not n and videos:
+        rebuild()   # 예전 형식에서 옮겨온 직후 한 번
+        n, first_seen, _ = store.keyword_series_state()
+    cur_counts = store.keyword_counts(_day(cut), _day(end))
+    # 콜드 스타트: 이번 구간 전에 발견한 기록이 아예 없으면 발견일 제한 없이 (비교 불가보다는 낫다)
+    seen_before = _day(cut) if first_seen and first_seen < _day(cut) else None
+    prev_counts = store.keyword_counts(_day(prev), _day(cut), seen_before)
+    return cur_counts, prev_counts
@@ -0,0 +1,83 @@
+from collections import deque
+from functools import lru_cache
+
+class Matcher:
+    """
+    Aho-Corasick 다중 패턴 매처.
+    - 패턴은 한 번만 컴파일, 텍스트 한 번 훑으면 모든 적중 라벨을 찾는다 (텍스트 길이에 선형).
+    - 패턴 → 라벨: 같은 패턴이 여러 라벨(그룹)에 속할 수 있다.
+    - lower=True 면 패턴/텍스트 모두 소문자로 비교.
+    """
+    def __init__(self, pairs, lower: bool = True):
+        self.lower = lower
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        out = [set()]
+        for pat, label in pairs:
+            pat = (pat or "").lower() if lower else (pat or "")
+            if not pat: continue
+            s = 0
+            for ch in pat:
+                nxt = self._goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[s][ch] = nxt
+                    self._goto.append({}); self._fail.append(0); out.append(set())
+                s = nxt
+            out[s].add(label)
+        # BFS 로 실패 링크 + 출력 병합
+        q = deque(self._goto[0].values())
+        while q:
+            s = q.popleft()
+            for ch, nxt in self._goto[s].items():
+                q.append(nxt)
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                out[nxt] |= out[self._fail[nxt]]
+        self._out = [frozenset(o) for o in out]
+
+    @classmethod
+    def from_list(cls, patterns, lower: bool = True):
+        """패턴 자체를 라벨로."""
+        return cls(((p, p) for p in patterns), lower=lower)
+
+    @classmethod
+    def from_groups(cls, groups: dict, lower: bool = True):
+        """{라벨: [패턴...]} → 라벨 단위 매처."""
+        return cls(((p, k) for k, pats in groups.items() for p in pats), lower=lower)
+
+    def labels(self, text: str) -> set:
+        """text 안에 등장하는 모든 라벨."""
+        text = text or ""
+        if self.lower: text = text.lower()
+        goto, fail, outs = self._goto, self._fail, self._out
+        found = set()
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if outs[s]: found |= outs[s]
+        return found
+
+    def search(self, text: str) -> bool:
+        """하나라도 적중하면 True (첫 적중에서 멈춤)."""
+        text = text or ""
+        if self.lower: text = text.lower()
+        goto, fail, outs = self._goto, self._fail, self._out
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if outs[s]: return True
+        return False
+
+@lru_cache(maxsize=64)
+def compiled(patterns: tuple, lower: bool = True) -> Matcher:
+    """같은 패턴 목록은 프로세스당 한 번만 컴파일."""
+    return Matcher.from_list(patterns, lower=lower)
@@ -0,0 +1,97 @@
+import os, re, zlib, random
+from datetime import datetime, timedelta
+from .io import now_kst
+from . import store
+
+# 뉴스 헤드라인 근사 중복 묶기: 문자 3-gram 슁글 → MinHash 서명 → LSH 밴드 버킷
+# - "[속보]"/"(종합)" 같은 머리말, " - 언론사" 꼬리는 떼고 비교
+# - 같은 버킷에 든 쌍만 서명 일치율(≈ 자카드)로 확인 → 항목 수에 거의 선형
+# - 내보낸 헤드라인 서명은 저장소에 며칠 남겨 다음 날 같은 기사 반복도 거른다
+NUM_PERM  = 64
+BANDS     = 16                     # 16밴드 × 4행 → 유사도 ~0.5 부근에서 후보가 된다
+ROWS      = NUM_PERM // BANDS
+SHINGLE   = 3
+THRESHOLD = float(os.getenv("NEWS_DUP_THRESHOLD", "0.5"))
+SEEN_DAYS = int(os.getenv("NEWS_SEEN_DAYS", "7"))
+
+_P = (1 << 61) - 1
+_rnd = random.Random(20240601)     # 고정 시드: 저장된 서명과 비교하려면 해시 계수가 실행마다 같아야 한다
+_A = [_rnd.randrange(1, _P) for _ in range(NUM_PERM)]
+_B = [_rnd.randrange(0, _P) for _ in range(NUM_PERM)]
+
+_PREFIX = re.compile(r"^\s*(?:[\[\(【〈<『][^\]\)】〉>』]{1,12}[\]\)】〉>』]\s*)+")
+_SUFFIX = re.compile(r"\s+[-–—|]\s+[^-–—|]{1,30}$")
+_NOISE  = re.compile(r"[\W_]+")
+
+def normalize(title: str) -> str:
+    t = _PREFIX.sub("", title or "")
+    t = _SUFFIX.sub("", t)
+    return _NOISE.sub("", t.lower())
+
+def shingles(text: str):
+    if len(text) <= SHINGLE: return {text} if text else set()
+    return {text[i:i+SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+def signature(title: str):
+    hs = [zlib.crc32(s.encode("utf-8")) for s in shingles(normalize(title))] or [0]
+    return tuple(min((a * x + b) % _P for x in hs) for a, b in zip(_A, _B))
+
+def similarity(s1, s2) -> float:
+    """서명 일치 비율 ≈ 슁글 집합 자카드 유사도."""
+    return sum(x == y for x, y in zip(s1, s2)) / NUM_PERM
+
+def band_keys(sig):
+    # 밴드 번호를 상위 비트에 → 다른 밴드끼리 충돌하지 않는 정수 키 (저장소 인덱스용)
+    return [(i << 32) | zlib.crc32(repr(sig[i*ROWS:(i+1)*ROWS]).encode()) for i in range(BANDS)]
+
+def clusters(sigs):
+    """서명 목록 → 근사 중복 묶음 (인덱스 리스트들, 입력 순서 유지)."""
+    parent = list(range(len(sigs)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]; i = parent[i]
+        return i
+    buckets = {}
+    for i, s in enumerate(sigs):
+        for b in band_keys(s):
+            for j in buckets.get(b, ()):
+                ri, rj = find(i), find(j)
+                if ri != rj and similarity(s, sigs[j]) >= THRESHOLD:
+                    parent[max(ri, rj)] = min(ri, rj)
+            buckets.setdefault(b, []).append(i)
+    groups = {}
+    for i in range(len(sigs)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+def dedup(items, score=lambda it: it.get("score", 0), suppress_seen: bool = True, today: str = None):
+    """
+    묶음마다 점수가 가장 높은 항목 하나 (같으면 먼저 온 것), 점수 내림차순.
+    suppress_seen: 지난 SEEN_DAYS 일(오늘 제외) 동안 내보낸 헤드라인과 겹치는 묶음은 통째로 뺀다.
+    """
+    items = [it for it in items if (it.get("title") or "").strip()]
+    sigs = [signature(it["title"]) for it in items]
+    today = today or now_kst().strftime("%Y-%m-%d")
+    since = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=SEEN_DAYS)).strftime("%Y-%m-%d")
+    out = []
+    for group in clusters(sigs):
+        if suppress_seen and any(_seen_before(sigs[i], since, today) for i in group): continue
+        best = max(group, key=lambda i: (score(items[i]), -i))
+        out.append((score(items[best]), -best, items[best], len(group)))
+    out.sort(key=lambda x: (x[0], x[1]), reverse=True)
+    for _, _, it, n in out:
+        it["dup_count"] = n
+    return [it for _, _, it, _ in out]
+
+def _seen_before(sig, since, today):
+    return any(similarity(sig, old) >= THRESHOLD for _, old in store.news_signatures(band_keys(sig), since, today))
+
+def remember(items, today: str = None):
+    """실제로 내보낸 헤드라인 서명 저장 + 오래된 것 정리."""
+    today = today or now_kst().strftime("%Y-%m-%d")
+    rows = []
+    for it in items:
+        sig = signature(it["title"])
+        rows.append((it["title"], sig, band_keys(sig)))
+    store.add_news_signatures(today, rows)
+    store.prune_news_signatures((datetime.strptime(today, "%Y-%m-%d") - timedelta(days=SEEN_DAYS)).strftime("%Y-%m-%d"))
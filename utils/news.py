@@ -1,13 +1,33 @@
-import os, requests, feedparser
+import os, time, heapq
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
 from .io import log
+from .http_client import conditional_get
+from .trace import span, bind
+from . import minhash
 
 NEWS_DAYS = int(os.getenv("NEWS_DAYS", "10"))
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY", "")
+# 재생 서버(utils.replay) 지정용
+NEWSAPI_BASE     = os.getenv("NEWSAPI_BASE", "https://newsapi.org/v2").rstrip("/")
+GOOGLE_NEWS_BASE = os.getenv("GOOGLE_NEWS_BASE", "https://news.google.com/rss").rstrip("/")
+# 토픽은 동시에 받고, 전체가 이 시간(초) 안에 안 끝난 토픽은 빈 결과 (요청 timeout 도 같은 값)
+NEWS_DEADLINE = float(os.getenv("NEWS_DEADLINE", "15"))
+RSS_MAX_ITEMS = 100     # 피드 앞쪽 100개까지만 본다
+RSS_CHUNK     = 16384
+NEWS_TOPK     = 30      # 토픽당 후보 수 (근사 중복 묶기/지난 기사 억제 후 3개)
+NEWS_PER_TOPIC = 3
 
-def newsapi_search(query: str, from_days: int):
-    url = "https://newsapi.org/v2/everything"
+NEWS_TOPICS = {
+    "시니어 건강": "건강 OR 혈당 OR 당뇨 OR 콜레스테롤 OR 피부 OR 노화 OR 한방 OR 운동 OR 무릎 OR 허리 OR 치매",
+    "시니어 북한": "북한 OR 평양 OR 김정은 OR 탈북 OR 제재 OR 미사일",
+}
+
+def newsapi_search(query: str, from_days: int, deadline: float = None):
+    url = f"{NEWSAPI_BASE}/everything"
     params = {
         "apiKey": NEWSAPI_KEY,
         "q": query,
@@ -16,7 +36,8 @@ def newsapi_search(query: str, from_days: int):
         "pageSize": 50,
         "from": (datetime.utcnow() - timedelta(days=from_days)).date().isoformat(),
     }
-    r = requests.get(url, params=params, timeout=30)
+    # 피드가 거의 안 바뀌므로 ETag/Last-Modified 조건부 GET (304 → 저장된 본문)
+    r = conditional_get(url, params=params, timeout=NEWS_DEADLINE, deadline=deadline)
     r.raise_for_status()
     arts = r.json().get("articles", [])
     out = []
@@ -30,41 +51,105 @@ def newsapi_search(query: str, from_days: int):
         })
     return out
 
-def google_news_rss_search(query: str, days: int):
-    url = f"https://news.google.com/rss/search?q={quote(query)}+when:{days}d&hl=ko&gl=KR&ceid=KR:ko"
-    feed = feedparser.parse(url)
-    out = []
-    for e in feed.entries[:100]:
-        title = e.get("title")
-        link  = e.get("link")
-        source= (e.get("source") or {}).get("title") or (e.get("author") or "")
-        pub   = e.get("published_parsed")
-        if pub:
-            dt = datetime(*pub[:6], tzinfo=timezone.utc)
-            age_days = (datetime.now(timezone.utc) - dt).days
-            recency = max(0.0, 1.0 - (age_days / (days+0.1)))
-        else:
-            recency = 0.5
-        out.append({"title": title, "url": link, "source": source, "score": recency})
-    out.sort(key=lambda x: x["score"], reverse=True)
+def _text(elem, tag):
+    child = elem.find(tag)
+    return (child.text or "").strip() if child is not None and child.text else ""
+
+def _recency(pub: str, days: int, now: datetime):
+    try:
+        dt = parsedate_to_datetime(pub)
+    except (TypeError, ValueError):
+        return 0.5
+    if dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, 1.0 - ((now - dt).days / (days+0.1)))
+
+def iter_rss_items(chunks, days: int, max_items: int = RSS_MAX_ITEMS):
+    """RSS 바이트 조각 → 항목을 도착하는 대로 (점수 포함). 다 쓴 <item> 은 바로 비워 메모리를 늘리지 않는다."""
+    parser = ElementTree.XMLPullParser(events=("end",))
+    now = datetime.now(timezone.utc)
+    n = 0
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag != "item": continue
+            src = elem.find("source")
+            yield {"title": _text(elem, "title"), "url": _text(elem, "link"),
+                   "source": (src.text or "").strip() if src is not None and src.text else _text(elem, "author"),
+                   "score": _recency(_text(elem, "pubDate"), days, now)}
+            elem.clear()
+            n += 1
+            if n >= max_items: return
+
+def top_rss_items(chunks, days: int, topk: int, max_items: int = RSS_MAX_ITEMS):
+    """
+    상위 topk (점수 내림차순, 같은 점수는 피드 순서). 제목이 같은 항목은 먼저 온 것만.
+    점수 상한은 1.0 → topk 가 모두 1.0 으로 차면 뒤 항목은 들어올 수 없으므로 읽기를 멈춘다.
+    """
+    heap, seen = [], set()    # (score, -seq, item) 최소 힙
+    for seq, it in enumerate(iter_rss_items(chunks, days, max_items)):
+        if not it["title"] or it["title"] in seen: continue
+        seen.add(it["title"])
+        entry = (it["score"], -seq, it)
+        if len(heap) < topk: heapq.heappush(heap, entry)
+        elif entry > heap[0]: heapq.heapreplace(heap, entry)
+        if len(heap) == topk and heap[0][0] >= 1.0: break
+    return [it for _, _, it in sorted(heap, reverse=True)]
+
+def google_news_rss_search(query: str, days: int, deadline: float = None, topk: int = RSS_MAX_ITEMS):
+    url = f"{GOOGLE_NEWS_BASE}/search?q={quote(query)}+when:{days}d&hl=ko&gl=KR&ceid=KR:ko"
+    try:
+        r = conditional_get(url, timeout=NEWS_DEADLINE, deadline=deadline, stream=True)
+        r.raise_for_status()
+    except Exception as e:
+        # 실패하면 빈 결과
+        log(f"RSS 실패 '{query[:20]}': {e}")
+        return []
+    read = []
+    def chunks():
+        for c in r.iter_content(RSS_CHUNK):
+            read.append(c); yield c
+    try:
+        out = top_rss_items(chunks(), days, topk)
+    except ElementTree.ParseError as e:
+        log(f"RSS 파싱 실패 '{query[:20]}': {e}")
+        return []
+    finally:
+        r.close()    # 일찍 멈췄으면 남은 본문은 받지 않는다
+    r.remember(b"".join(read))    # 읽은 앞부분만 저장 → 304 때 같은 결과
     return out
 
-def fetch_news_topics():
-    topics = {
-        "시니어 건강": "건강 OR 혈당 OR 당뇨 OR 콜레스테롤 OR 피부 OR 노화 OR 한방 OR 운동 OR 무릎 OR 허리 OR 치매",
-        "시니어 북한": "북한 OR 평양 OR 김정은 OR 탈북 OR 제재 OR 미사일",
-    }
+def _source_note():
+    return "데이터 출처: NewsAPI(인기순)" if NEWSAPI_KEY else "데이터 출처: Google News RSS (NEWSAPI 미사용)"
+
+def _fetch_topic(ch, q, deadline):
+    with span("news.fetch", topic=ch):
+        if NEWSAPI_KEY: return newsapi_search(q, NEWS_DAYS, deadline)
+        return google_news_rss_search(q, NEWS_DAYS, deadline, topk=NEWS_TOPK)
+
+def fetch_news_topics(topics: dict = None):
+    """토픽별 상위 3개 기사. 토픽 수만큼 동시에 받으므로 토픽을 늘려도 순차 지연이 늘지 않는다."""
+    topics = topics or NEWS_TOPICS
+    deadline = time.monotonic() + NEWS_DEADLINE    # 요청 timeout/재시도도 이 마감 안에서만
+    ex = ThreadPoolExecutor(max_workers=max(1, len(topics)))
+    futs = {ch: ex.submit(bind(_fetch_topic), ch, q, deadline) for ch, q in topics.items()}
+    wait(futs.values(), timeout=NEWS_DEADLINE)
+    ex.shutdown(wait=False, cancel_futures=True)    # 마감 넘긴 요청은 기다리지 않는다
     out = {}
-    for ch, q in topics.items():
-        if NEWSAPI_KEY:
-            items = newsapi_search(q, NEWS_DAYS); source = "데이터 출처: NewsAPI(인기순)"
+    for ch, f in futs.items():
+        items = []
+        if not f.done():
+            log(f"뉴스 '{ch}' {NEWS_DEADLINE:g}s 안에 못 받음 → 생략")
         else:
-            items = google_news_rss_search(q, NEWS_DAYS); source = "데이터 출처: Google News RSS (NEWSAPI 미사용)"
-        seen, uniq = set(), []
-        for it in items:
-            t = (it["title"] or "").strip()
-            if not t or t in seen: continue
-            seen.add(t); uniq.append(it)
-        out[ch] = {"items": uniq[:3], "source_note": source}
+            try:
+                items = f.result()
+            except Exception as e:
+                log(f"뉴스 '{ch}' 실패: {e}")
+        # 근사 중복 묶음마다 최고 점수 1개, 지난 며칠 내보낸 기사와 같은 묶음은 제외 (모자라면 채움)
+        picked = minhash.dedup(items)[:NEWS_PER_TOPIC]
+        if len(picked) < NEWS_PER_TOPIC:
+            ids = {id(it) for it in picked}
+            picked += [it for it in minhash.dedup(items, suppress_seen=False) if id(it) not in ids][:NEWS_PER_TOPIC - len(picked)]
+        minhash.remember(picked)
+        out[ch] = {"items": picked, "source_note": _source_note()}
         log(f"뉴스 '{ch}' {len(out[ch]['items'])}개")
     return out
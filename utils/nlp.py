@@ -1,29 +1,116 @@
-import re
 from collections import Counter
+from functools import lru_cache
+from itertools import chain
+from .io import log_info
+from .trace import span
 
 STOP = set(["영상","뉴스","속보","라이브","LIVE","풀영상","하이라이트","클립","브이로그","라디오","오디오북"])
 
-def tokenize(text: str):
-    t = re.sub(r"[\[\]\(\)<>【】『』〈〉\-–—_|@:~·•….,!?\"'`]", " ", text or "")
-    toks = [w.strip() for w in t.split() if w.strip()]
-    return [w for w in toks if len(w) >= 2 and w not in STOP]
+# 구두점 → 공백 (str.translate 한 번, 정규식 치환 없음)
+_PUNCT = str.maketrans({c: " " for c in "[]()<>【】『』〈〉-–—_|@:~·•…․.,!?\"'`“”‘’#/+=*&%^{};"})
 
+# 조사·어미 꼬리: 뒤집어서 trie 로 → 토큰 끝에서 한 글자씩 따라가며 가장 긴 꼬리를 뗀다
+# - 남는 어간이 한글 2자 이상일 때만 (아이/고기 같은 2음절 명사 보호)
+# - 한 글자 꼬리(이/가/은/는/의/도/한…)는 어간이 아는 명사(_NOUNS + 토픽 키워드)일 때만
+#   → 어린이/고양이/김정은/민주주의/경기도/무제한 처럼 그 글자로 끝나는 명사는 그대로
+#   (를/에 는 명사 끝 글자로 거의 안 쓰여 예외)
+# - 어미는 "명사+하다/되다/이다" 활용만 → 공개했다/공개하는/공개된 → 공개
+_JOSA = ("이 가 을 를 은 는 의 에 도 만 와 과 로 으로 께 에서 에게 한테 께서 까지 부터 보다 처럼 마저 조차 "
+         "이나 이랑 랑 에는 에서는 에게는 으로는 로는 과의 와의 에서의 으로의 이란 이라는 이라고 라는 라고 "
+         "들 들이 들을 들은 들의 들에게 들과 들도")
+_EOMI = ("하다 한다 했다 합니다 했습니다 하는 하던 했던 하고 하며 하면 하자 해서 했고 했는데 한 할 해 "
+         "되다 된다 됐다 됩니다 됐습니다 되는 되던 되어 되자 된 될 "
+         "이다 입니다 이었다 였다 이었던 였던")
+_MIN_STEM = 2
+_UNGATED = {"를", "에"}
+_NOUNS = set("""
+가족 식구 부모 자식 자녀 아들 딸 며느리 예비며느리 사위 시어머니 시아버지 시댁 친정 장모 장인 어머니 아버지 엄마 아빠
+남편 아내 부부 형제 자매 형님 동생 손자 손녀 할머니 할아버지 어르신 노인 시니어 친구 동창 이웃 사장 회장 청소부 경비원
+사연 진실 비밀 반전 복수 무시 조롱 결말 정체 유산 상속 유언 재산 재혼 이혼 황혼 결혼 연애 효도 고부갈등 갈등
+노후 연금 건강 치매 병원 의사 수술 당뇨 혈당 무릎 허리 운동 행복 눈물 인생 마지막 그날 모두 동창회 진실게임
+""".split())
+
+@lru_cache(maxsize=1)
+def _known():
+    from . import topics    # 토픽 키워드 사전도 명사로 본다 (지연 로드)
+    words = set(_NOUNS)
+    for k, vs in topics.KEYWORDS.items():
+        words.update(w for w in [k, *vs] if w.isalnum())
+    return frozenset(words)
+
+def _build_trie(words):
+    root = {}
+    for w in words:
+        node = root
+        for ch in reversed(w):
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return root
+
+_SUFFIX_TRIE = _build_trie(set(_JOSA.split()) | set(_EOMI.split()))
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+def strip_suffix(tok: str) -> str:
+    """토큰 끝의 조사/어미 중 떼어도 되는 가장 긴 것 하나를 뗀다 (한글 토큰만)."""
+    node, cuts = _SUFFIX_TRIE, []
+    for i in range(len(tok) - 1, _MIN_STEM - 1, -1):
+        node = node.get(tok[i])
+        if node is None: break
+        if "" in node: cuts.append(i)
+    for cut in reversed(cuts):    # 긴 꼬리부터
+        if not all(_is_hangul(c) for c in tok[cut - _MIN_STEM:cut]): continue
+        if len(tok) - cut == 1 and tok[cut] not in _UNGATED and tok[:cut] not in _known(): continue
+        return tok[:cut]
+    return tok
+
+def _bigrams(tok: str):
+    return [tok[i:i+2] for i in range(len(tok) - 1)] if len(tok) > 2 else [tok]
+
+@lru_cache(maxsize=200_000)
+def tokens(text: str, bigram: bool = False) -> tuple:
+    """
+    문자열 하나 → 토큰 튜플 (문자열 단위 메모: 태그/제목은 후보 간에 많이 겹친다).
+    bigram=True: 조사를 뗀 토큰을 다시 글자 2-gram 으로 (띄어쓰기가 제각각인 복합명사용)
+    """
+    out = []
+    for w in (text or "").translate(_PUNCT).split():
+        w = strip_suffix(w)
+        if len(w) < 2 or w in STOP: continue
+        if bigram: out += _bigrams(w)
+        else: out.append(w)
+    return tuple(out)
+
+def tokenize(text: str, bigram: bool = False):
+    return list(tokens(text, bigram))
+
+def tokenize_many(texts, bigram: bool = False):
+    """제목/태그 여러 개를 한 번에 → 토큰 튜플 리스트 (같은 문자열은 한 번만 토큰화)."""
+    memo = {}
+    out = []
+    for t in texts:
+        r = memo.get(t)
+        if r is None:
+            r = memo[t] = tokens(t or "", bigram)
+        out.append(r)
+    return out
+
+@span("extract_top_keywords")
 def extract_top_keywords(titles: list[str], tags: list[list[str]], topk=12):
-    c = Counter()
-    for t in titles:
-        for tok in tokenize(t):
-            c[tok] += 1
-    for taglist in tags:
-        for tag in taglist or []:
-            for tok in tokenize(tag):
-                c[tok] += 1
+    texts = chain(titles, chain.from_iterable(taglist or [] for taglist in tags))
+    c = Counter(chain.from_iterable(tokenize_many(texts)))
     return [w for w,_ in c.most_common(topk)]
 
-def make_strong_titles_from_keywords(kws: list[str], n:int=5):
-    """표절 금지: 원제 복사 금지. 템플릿+키워드 합성으로 완전 신규 생성."""
-    k1 = kws[0] if kws else "가족"
-    k2 = kws[1] if len(kws)>1 else "사연"
-    k3 = kws[2] if len(kws)>2 else "반전"
+@span("make_titles")
+def make_strong_titles_from_keywords(kws: list[str], n:int=5, check=True):
+    """표절 금지: 원제 복사 금지. 템플릿+키워드 합성으로 완전 신규 생성.
+    kws 가 3개보다 적으면 누적 heavy hitter 키워드로 채운다.
+    check: 지금까지 본 실제 제목과 너무 비슷하면(utils.originality) 버리고 키워드를 돌려 다시 만든다."""
+    if len(kws) < 3:
+        from .hitters import top_keywords   # hitters 가 nlp 를 쓰므로 여기서 import
+        kws = list(dict.fromkeys(list(kws) + top_keywords(3)))
+    pool = list(dict.fromkeys(list(kws[:6]) + ["가족", "사연", "반전"]))
 
     bases = [
         "무시하던 {k1}, 정체 드러난 그날… 모두 뒤집혔습니다",
@@ -33,11 +120,23 @@ def make_strong_titles_from_keywords(kws: list[str], n:int=5):
         "황혼의 재혼, 숨긴 진실과 {k2}… 마지막에 오열했습니다"
     ]
     thumbs = ["뒤집어버렸습니다","충격적입니다","복수했습니다","상상도 못했습니다","반전 결말"]
-    out = []
-    for i in range(n):
-        base = bases[i % len(bases)]
-        out.append({
-            "title": base.format(k1=k1, k2=k2, k3=k3),
-            "thumb": thumbs[i % len(thumbs)]
-        })
+    if check:
+        from .originality import check as original
+    out, seen, rejected = [], set(), []
+    # 한 바퀴(템플릿 5개)마다 키워드 배정을 한 칸씩 돌린다 → 첫 바퀴는 kws[0..2]
+    for i in range(len(bases) * len(pool)):
+        r = i // len(bases)
+        k1, k2, k3 = (pool[(r + j) % len(pool)] for j in range(3))
+        t = {"title": bases[i % len(bases)].format(k1=k1, k2=k2, k3=k3), "thumb": thumbs[i % len(thumbs)]}
+        if t["title"] in seen: continue
+        seen.add(t["title"])
+        ok, near = original(t["title"]) if check else (True, [])
+        if not ok:
+            rejected.append((near[0][0], t)); continue
+        out.append(t)
+        if len(out) >= n: break
+    if rejected:
+        log_info(f"신규 제목 {len(rejected)}개 거절 (기존 제목과 유사), 예: {rejected[0][1]['title']}")
+    # 조합이 모자라면 덜 비슷한 것부터 채운다
+    out += [t for _, t in sorted(rejected, key=lambda x: x[0])][:n - len(out)]
     return out[:n]
@@ -0,0 +1,100 @@
+import os, re, math, pickle
+from array import array
+from pathlib import Path
+from .io import log_info
+from . import store
+
+# 생성 제목 독창성 검사: 지금까지 보강한 모든 영상 제목(저장소 videos)의 글자 3-gram 역색인
+# - 색인은 파일로 저장, 다음 실행은 저장소에 새로 들어온 제목(rowid > 마지막)만 이어 붙인다
+# - 질의는 prefix filtering: 자카드 ≥ t 인 제목은 질의 gram 중 가장 드문 |q|-⌈t|q|⌉+1 개 안에
+#   적어도 하나를 공유한다 → 흔한 gram 의 긴 목록은 읽지 않고, 후보만 실제 자카드로 확인 (정확)
+INDEX_PATH = Path(os.getenv("TITLE_INDEX_PATH", "data/cache/title_index.pkl"))
+MAX_SIM    = float(os.getenv("TITLE_MAX_SIM", "0.5"))    # 이보다 비슷하면 생성 제목 거절
+NGRAM      = 3
+_VERSION   = 1
+
+_NOISE = re.compile(r"[\W_]+")
+
+def grams(title: str):
+    t = _NOISE.sub("", (title or "").lower())
+    if len(t) <= NGRAM: return {t} if t else set()
+    return {t[i:i+NGRAM] for i in range(len(t) - NGRAM + 1)}
+
+def jaccard(a, b) -> float:
+    if not a or not b: return 0.0
+    n = len(a & b)
+    return n / (len(a) + len(b) - n)
+
+class TitleIndex:
+    def __init__(self, hwm=0, titles=None, post=None):
+        self.hwm = hwm                 # 색인에 반영된 마지막 videos rowid
+        self.titles = titles or {}     # rowid → 제목
+        self.post = post or {}         # gram → array('I') rowid 목록
+
+    def add(self, rowid, title):
+        if not title: return
+        self.titles[rowid] = title
+        for g in grams(title):
+            p = self.post.get(g)
+            if p is None: p = self.post[g] = array("I")
+            p.append(rowid)
+
+    def closest(self, title: str, k: int = 3, floor: float = MAX_SIM):
+        """자카드 ≥ floor 인 기존 제목 중 가까운 k개 → [(score, title)] 높은 순."""
+        q = grams(title)
+        if not q: return []
+        need = math.ceil(floor * len(q) - 1e-9)
+        probe = sorted(q, key=lambda g: (len(self.post.get(g, ())), g))[:len(q) - need + 1]
+        cand = set()
+        for g in probe:
+            cand.update(self.post.get(g, ()))
+        hits = []
+        for rid in cand:
+            t = self.titles[rid]
+            s = jaccard(q, grams(t))
+            if s >= floor: hits.append((s, t))
+        hits.sort(key=lambda x: (-x[0], x[1]))
+        return hits[:k]
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("wb") as fp:
+            pickle.dump({"version": _VERSION, "ngram": NGRAM, "hwm": self.hwm, "titles": self.titles, "post": self.post},
+                        fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path):
+        try:
+            with path.open("rb") as fp:
+                z = pickle.load(fp)
+        except Exception:
+            return None
+        if z.get("version") != _VERSION or z.get("ngram") != NGRAM: return None
+        return cls(z["hwm"], z["titles"], z["post"])
+
+_index = None
+
+def index() -> TitleIndex:
+    """저장된 색인 + 저장소에 새로 들어온 제목만 추가 (바뀌었으면 다시 저장)."""
+    global _index
+    idx = _index or (TitleIndex.load(INDEX_PATH) if INDEX_PATH.exists() else None)
+    if idx is None or store.max_video_rowid() < idx.hwm:   # 저장소가 새로 만들어졌으면 처음부터
+        idx = TitleIndex()
+    added = 0
+    while True:
+        rows = store.titles_after(idx.hwm)
+        if not rows: break
+        for rid, title in rows: idx.add(rid, title)
+        idx.hwm = rows[-1][0]; added += len(rows)
+    if added:
+        idx.save(INDEX_PATH)
+        log_info(f"제목 색인: +{added} (총 {len(idx.titles)})")
+    _index = idx
+    return idx
+
+def check(title: str, max_sim: float = MAX_SIM):
+    """생성 제목 → (통과 여부, 가장 비슷한 기존 제목들 [(score, title)])."""
+    near = index().closest(title, k=3, floor=max_sim)
+    return (not near or near[0][0] <= max_sim), near
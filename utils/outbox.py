@@ -0,0 +1,168 @@
+import os, re, time, uuid, random, contextlib
+from pathlib import Path
+from .io import now_kst, log_info, log_warn, log_error
+from .trace import span
+
+# 메일 보내기함(outbox): 작업은 완성된 MIME 메시지를 파일로 떨구기만 하고, 발송은 deliver() 한 번에
+# - OUTBOX_DIR/*.eml : 대기 (이름 = 생성 시각 → 오래된 것부터 발송), 보낸 것은 지운다
+# - OUTBOX_DIR/failed/ : 영구 실패(5xx 수신 거절 등) → 사람이 확인
+# - 한 번의 SMTP 세션(연결/STARTTLS/로그인 1회)으로 대기 메시지 전부 발송
+# - 일시 실패(연결 끊김/4xx/타임아웃)는 다시 연결해 남은 것부터 재시도, 지수 백오프(+지터)
+# - 발송이 실패해도 메시지는 남는다 → 다음 실행이나 `python cli.py deliver` 가 이어서 보낸다
+OUTBOX_DIR      = Path(os.getenv("OUTBOX_DIR", "data/outbox"))
+SMTP_RETRIES    = int(os.getenv("SMTP_RETRIES", "3"))
+SMTP_BACKOFF    = float(os.getenv("SMTP_BACKOFF", "2"))
+SMTP_BACKOFF_MAX = float(os.getenv("SMTP_BACKOFF_MAX", "60"))
+SMTP_TIMEOUT    = float(os.getenv("SMTP_TIMEOUT", "30"))
+
+_hold = 0
+
+def smtp_env():
+    need = ["SMTP_HOST", "SMTP_PORT", "SMTP_USER", "SMTP_PASS", "REPORT_EMAIL_TO"]
+    miss = [k for k in need if not os.getenv(k)]
+    if miss:
+        raise EnvironmentError("SMTP 환경변수 누락: " + ", ".join(miss))
+
+    host = os.getenv("SMTP_HOST")
+    # PORT는 문자열일 수도 있으므로 안전하게 캐스팅
+    try:
+        port = int(os.getenv("SMTP_PORT"))
+    except Exception:
+        raise ValueError("SMTP_PORT는 정수여야 합니다.")
+
+    user = os.getenv("SMTP_USER")
+    pwd = os.getenv("SMTP_PASS")
+    to_addr = os.getenv("REPORT_EMAIL_TO")
+
+    # 선택 옵션
+    sender_name = os.getenv("SMTP_SENDER_NAME", "")  # 예: "Auto Story Bot"
+    use_ssl = os.getenv("SMTP_SSL", "0") == "1"      # SMTPS(SSL) 사용 (포트 보통 465)
+    use_tls = os.getenv("SMTP_USE_TLS", "1") != "0"  # STARTTLS 사용 (포트 보통 587)
+
+    return host, port, user, pwd, to_addr, sender_name, use_ssl, use_tls
+
+def enqueue(msg) -> Path:
+    """완성된 email.message 를 보내기함에 저장 (원자적: 임시 파일 → rename)."""
+    from email import policy
+    from email.utils import formatdate, make_msgid
+    if "Date" not in msg: msg["Date"] = formatdate(localtime=True)
+    if "Message-ID" not in msg: msg["Message-ID"] = make_msgid()
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    path = OUTBOX_DIR / f"{now_kst():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:6]}.eml"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(msg.as_bytes(policy=policy.SMTP))   # 줄바꿈 CRLF (RFC 5321, 엄격한 MTA는 bare LF 거부)
+    os.replace(tmp, path)
+    log_info(f"보내기함 저장: {path.name}", subject=str(msg["Subject"] or ""))
+    return path
+
+def pending():
+    return sorted(OUTBOX_DIR.glob("*.eml")) if OUTBOX_DIR.exists() else []
+
+@contextlib.contextmanager
+def batch():
+    """이 안에서 만든 메시지는 flush() 로 보내지 않고 모아 두었다가 끝날 때 한 세션으로 발송 (cli all)."""
+    global _hold
+    _hold += 1
+    try:
+        yield
+    finally:
+        _hold -= 1
+    if not _hold: deliver()
+
+def flush():
+    """작업 끝: batch() 밖이면 바로 발송."""
+    if not _hold: deliver()
+
+def _connect(host, port, user, pwd, use_ssl, use_tls):
+    import smtplib, ssl
+    if use_ssl:
+        s = smtplib.SMTP_SSL(host, port, context=ssl.create_default_context(), timeout=SMTP_TIMEOUT)
+    else:
+        s = smtplib.SMTP(host, port, timeout=SMTP_TIMEOUT)
+        s.ehlo()
+        if use_tls:
+            try:
+                s.starttls(context=ssl.create_default_context())
+                s.ehlo()
+            except smtplib.SMTPException as e:
+                # 일부 서버가 STARTTLS를 지원하지 않을 수 있음 → 경고만 하고 계속
+                log_warn(f"STARTTLS 미지원, 평문으로 계속: {e}")
+    try:
+        s.login(user, pwd)
+    except Exception:
+        _close(s); raise
+    return s
+
+def _close(s):
+    try:
+        s.quit()
+    except Exception:
+        # 네트워크 환경에 따라 quit() 예외 무시
+        s.close()
+
+def _transient(e) -> bool:
+    import smtplib
+    if isinstance(e, smtplib.SMTPAuthenticationError): return False
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in e.recipients.values())
+    if isinstance(e, smtplib.SMTPResponseException): return 400 <= e.smtp_code < 500
+    return isinstance(e, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(SMTP_BACKOFF * (2 ** attempt), SMTP_BACKOFF_MAX))   # full jitter
+
+def _envelope(path: Path, default_to: str):
+    from email import message_from_bytes, policy
+    from email.utils import getaddresses, parseaddr
+    data = re.sub(rb"\r?\n", b"\r\n", path.read_bytes())   # 예전에 LF 로 저장된 메시지도 CRLF 로
+    msg = message_from_bytes(data, policy=policy.SMTP)
+    rcpts = [a for _, a in getaddresses(msg.get_all("To", []) + msg.get_all("Cc", []) + msg.get_all("Bcc", [])) if a]
+    return parseaddr(str(msg["From"] or ""))[1], rcpts or [default_to], data
+
+def deliver(retries: int = None):
+    """대기 메시지 전부를 한 SMTP 세션으로 발송 → (보낸 수, 남은 수). 남은 게 있으면 RuntimeError."""
+    queue = pending()
+    if not queue: return 0, 0
+    host, port, user, pwd, to_addr, _, use_ssl, use_tls = smtp_env()
+    retries = SMTP_RETRIES if retries is None else retries
+    sent = failed = 0
+    attempt = 0
+    with span("email.deliver", queued=len(queue)) as sp:
+        while queue:
+            try:
+                s = _connect(host, port, user, pwd, use_ssl, use_tls)
+            except Exception as e:
+                if not _transient(e) or attempt >= retries: raise
+                delay = _backoff(attempt); attempt += 1
+                log_warn(f"SMTP 연결 실패, {delay:.1f}s 후 재시도 ({attempt}/{retries}): {type(e).__name__}: {e}")
+                time.sleep(delay); continue
+            try:
+                while queue:
+                    path = queue[0]
+                    try:
+                        sender, rcpts, data = _envelope(path, to_addr)
+                        s.sendmail(sender or user, rcpts, data)
+                    except Exception as e:
+                        if _transient(e): raise
+                        # 영구 실패: 이 메시지만 빼 두고 나머지는 계속
+                        (OUTBOX_DIR / "failed").mkdir(exist_ok=True)
+                        os.replace(path, OUTBOX_DIR / "failed" / path.name)
+                        log_error(f"메일 발송 실패(영구): {path.name}: {type(e).__name__}: {e}")
+                        queue.pop(0); failed += 1
+                        continue
+                    path.unlink()
+                    queue.pop(0); sent += 1
+            except Exception as e:
+                if not _transient(e) or attempt >= retries:
+                    log_error(f"메일 발송 중단: {type(e).__name__}: {e}", remaining=len(queue))
+                    break
+                delay = _backoff(attempt); attempt += 1
+                log_warn(f"SMTP 일시 오류, {delay:.1f}s 후 남은 {len(queue)}통 재시도 ({attempt}/{retries}): {type(e).__name__}: {e}")
+                time.sleep(delay)
+            finally:
+                _close(s)
+        sp.set(sent=sent, failed=failed, left=len(queue), retries=attempt)
+    log_info(f"메일 발송: {sent}통" + (f", 영구 실패 {failed}통" if failed else "") + (f", 대기 {len(queue)}통" if queue else ""))
+    if queue or failed:
+        raise RuntimeError(f"메일 발송 미완료: 대기 {len(queue)}통, 실패 {failed}통 ({OUTBOX_DIR})")
+    return sent, len(queue)
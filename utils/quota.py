@@ -0,0 +1,91 @@
+import os, json, threading
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from .io import log_event, log_warn
+
+# YouTube Data API 쿼터 장부 (엔드포인트별 단가 × 호출 수)
+QUOTA_PATH   = Path(os.getenv("YT_QUOTA_PATH", "data/cache/quota.json"))
+DAILY_BUDGET = int(os.getenv("YT_DAILY_BUDGET", "10000"))
+# 남은 예산이 이 비율 아래로 내려가면 low 우선순위 호출(후순위 폴백 구간 등)은 거절
+LOW_RESERVE  = float(os.getenv("YT_LOW_PRIORITY_RESERVE", "0.3"))
+KEEP_DAYS    = 14
+
+COSTS = {"search": 100, "videos": 1, "playlistItems": 1, "channels": 1}
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+_lock = threading.Lock()
+_ledger = None
+_entry = "unknown"
+RUN = {}   # (entry, endpoint) -> {"calls","units","refused"}
+
+def _quota_day():
+    # 쿼터는 태평양 시간 자정에 초기화된다
+    try:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo("America/Los_Angeles")
+    except Exception:
+        tz = timezone(timedelta(hours=-8))
+    return datetime.now(tz).strftime("%Y-%m-%d")
+
+def _load():
+    global _ledger
+    if _ledger is None:
+        try:
+            _ledger = json.loads(QUOTA_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            _ledger = {}
+    return _ledger
+
+def _save():
+    days = sorted(_ledger)
+    for d in days[:-KEEP_DAYS]: _ledger.pop(d, None)
+    QUOTA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = QUOTA_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(_ledger, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(QUOTA_PATH)
+
+def set_entry(name: str):
+    """현재 실행 진입점(daily/weekly/monthly) — 장부와 요약의 구분 키."""
+    global _entry
+    _entry = name
+
+def used_today() -> int:
+    with _lock:
+        return _load().get(_quota_day(), {}).get("total", 0)
+
+def remaining() -> int:
+    return DAILY_BUDGET - used_today()
+
+def charge(endpoint: str, priority: str = "normal"):
+    """호출 직전 단가만큼 차감. 예산 초과(또는 low 호출의 예약분 침범)면 QuotaExceeded."""
+    cost = COSTS.get(endpoint, 1)
+    with _lock:
+        day = _load().setdefault(_quota_day(), {"total": 0, "by": {}})
+        left = DAILY_BUDGET - day["total"]
+        floor = DAILY_BUDGET * LOW_RESERVE if priority == "low" else 0
+        run = RUN.setdefault((_entry, endpoint), {"calls": 0, "units": 0, "refused": 0})
+        if left - cost < floor:
+            run["refused"] += 1
+            refused = True
+        else:
+            refused = False
+            day["total"] += cost
+            key = f"{_entry}:{endpoint}"
+            day["by"][key] = day["by"].get(key, 0) + cost
+            run["calls"] += 1
+            run["units"] += cost
+            _save()
+    if refused:
+        log_warn(f"quota refused {endpoint} ({priority}) left={left}", endpoint=endpoint)
+        raise QuotaExceeded(f"{endpoint} 쿼터 부족 (남은 {left}, 필요 {cost}, 우선순위 {priority})")
+
+def log_quota_summary(cat: str = None):
+    """이번 실행의 진입점·엔드포인트별 사용량 + 오늘 누적."""
+    for (entry, ep), r in sorted(RUN.items()):
+        log_event("quota", cat=cat or entry, endpoint=ep, calls=r["calls"], units=r["units"], refused=r["refused"],
+                  note=f"{entry}:{ep} units={r['units']} refused={r['refused']}")
+    total = used_today()
+    log_event("quota_total", cat=cat, used=total, budget=DAILY_BUDGET,
+              count=sum(r["units"] for r in RUN.values()), note=f"today {total}/{DAILY_BUDGET}")
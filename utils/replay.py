@@ -0,0 +1,203 @@
+"""
+녹화/재생 하네스 (오프라인 실행·벤치마크용)
+
+- 녹화: HTTP_RECORD_DIR=fixtures/live 로 아무 진입점이나 실행하면
+  utils.http_client 를 지나는 모든 응답(YouTube search/videos/…, NewsAPI, Google News RSS)이 파일로 저장된다.
+- 재생: python -m utils.replay serve --dir fixtures/live --port 8765 [--latency-ms 80 --jitter-ms 40 --error-rate 0.05]
+  다른 셸에서 `python -m utils.replay env --port 8765` 가 출력하는 *_BASE 환경변수를 export 하고 실행.
+
+요청 키 = 원래 호스트 + 경로 + 정규화된 쿼리.
+인증키(key/apiKey)는 빼고, 시각 파라미터(publishedAfter 등)는 '녹화 시점 기준 며칠 전'으로 바꿔 저장한다.
+그래서 다른 날 재생해도 같은 구간 요청이 같은 픽스처에 맞는다.
+"""
+import os, json, time, base64, random, hashlib, argparse, threading
+from pathlib import Path
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qsl
+
+RECORD_DIR = os.getenv("HTTP_RECORD_DIR", "")
+
+_DROP = {"key", "apiKey"}
+_TIME = {"publishedAfter", "publishedBefore", "from", "to"}
+
+# 원래 호스트 → 재생 서버 경로 접두어 (env 출력용)
+BASE_ENVS = {
+    "YOUTUBE_API_BASE": "www.googleapis.com/youtube/v3",
+    "NEWSAPI_BASE": "newsapi.org/v2",
+    "GOOGLE_NEWS_BASE": "news.google.com/rss",
+}
+
+def _rel_days(value: str, now: datetime):
+    try:
+        t = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if t.tzinfo is None: t = t.replace(tzinfo=timezone.utc)
+    return f"-{round((now - t).total_seconds() / 86400)}d"
+
+def request_key(host: str, path: str, params) -> str:
+    """호스트+경로+정규화 쿼리 (녹화/재생 공용)."""
+    now = datetime.now(timezone.utc)
+    norm = []
+    for k, v in params:
+        if k in _DROP: continue
+        v = str(v)
+        if k in _TIME: v = _rel_days(v, now)
+        norm.append((k, v))
+    norm.sort()
+    return f"/{host}{path}?" + "&".join(f"{k}={v}" for k, v in norm)
+
+def _fixture_name(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + ".json"
+
+def _url_key(url: str, params: dict = None):
+    u = urlsplit(url)
+    pairs = parse_qsl(u.query, keep_blank_values=True) + list((params or {}).items())
+    return request_key(u.netloc, u.path, pairs)
+
+# ---- 녹화 ----
+_lock = threading.Lock()
+
+def record(url: str, params: dict, response):
+    """http_client 가 HTTP_RECORD_DIR 설정 시 응답마다 호출.
+    stream=True 응답은 본문을 여기서 읽으면 호출자가 빈 스트림을 받는다 → iter_content 를 감싸
+    호출자가 읽는 청크를 그대로 모았다가 다 읽거나 close() 될 때 저장 (중간에 멈춰도 나머지를 마저 읽어 픽스처는 완전하게)."""
+    if not RECORD_DIR: return
+    key = _url_key(url, params)
+    if getattr(response, "_content", None) is False:   # 아직 안 읽은 스트림
+        _tee(key, response)
+        return
+    _write(key, response, response.content or b"")
+
+def _tee(key, response):
+    inner, close = response.iter_content, response.close
+    st = {"it": None, "got": [], "done": False}
+    def finish():
+        if st["done"]: return
+        st["done"] = True
+        try:
+            # 호출자가 일찍 멈췄으면(조기 종료 파서) 녹화 모드에서만 나머지를 마저 받는다
+            st["got"].extend(st["it"] if st["it"] is not None else inner(16384))
+        except Exception:
+            pass
+        _write(key, response, b"".join(st["got"]))
+    def iter_content(chunk_size=1, decode_unicode=False):
+        st["it"] = inner(chunk_size)
+        for c in st["it"]:
+            st["got"].append(c)
+            yield c
+        finish()
+    def closing():
+        finish(); close()
+    response.iter_content, response.close = iter_content, closing
+
+def _write(key, response, body):
+    try:
+        text, enc = body.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        text, enc = base64.b64encode(body).decode("ascii"), "base64"
+    data = {
+        "key": key,
+        "status": response.status_code,
+        "content_type": response.headers.get("Content-Type", "application/octet-stream"),
+        "encoding": enc,
+        "body": text,
+    }
+    d = Path(RECORD_DIR); d.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        (d / _fixture_name(key)).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+def load_fixtures(fixture_dir) -> dict:
+    out = {}
+    for p in Path(fixture_dir).glob("*.json"):
+        try:
+            data = json.loads(p.read_text(encoding="utf-8"))
+            out[data["key"]] = data
+        except Exception:
+            continue
+    return out
+
+# ---- 재생 서버 ----
+def make_server(fixture_dir, port: int = 8765, latency_ms: float = 0, jitter_ms: float = 0,
+                error_rate: float = 0.0, host: str = "127.0.0.1", fixtures: dict = None, resolver=None):
+    """
+    로컬 YouTube/News API 대역 서버.
+    fixtures 를 직접 넘기면 파일 대신 사용, resolver(host, path, params) → (status, content_type, body) | None
+    를 넘기면 픽스처에 없는 요청을 동적으로 응답 (벤치마크 합성 코퍼스).
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    table = fixtures if fixtures is not None else load_fixtures(fixture_dir)
+    stats = {"requests": 0, "misses": 0, "errors": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"    # keep-alive (클라이언트 커넥션 풀과 동일 조건)
+        disable_nagle_algorithm = True   # 헤더/본문 분할 전송 + 지연 ACK 로 요청마다 ~40ms 붙는 것 방지
+        wbufsize = -1
+
+        def log_message(self, *a):
+            pass
+
+        def _send(self, status, ctype, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            self.wfile.flush()
+
+        def do_GET(self):
+            stats["requests"] += 1
+            delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+            if delay: time.sleep(delay)
+            if error_rate and random.random() < error_rate:
+                stats["errors"] += 1
+                return self._send(503, "application/json", b'{"error":"injected"}')
+            u = urlsplit(self.path)
+            parts = u.path.lstrip("/").split("/", 1)
+            h, path = parts[0], "/" + (parts[1] if len(parts) > 1 else "")
+            pairs = parse_qsl(u.query, keep_blank_values=True)
+            key = request_key(h, path, pairs)
+            fx = table.get(key)
+            if fx is None and resolver is not None:
+                hit = resolver(h, path, dict(pairs))
+                if hit is not None:
+                    return self._send(*hit)
+            if fx is None:
+                stats["misses"] += 1
+                return self._send(404, "application/json", json.dumps({"error": "no fixture", "key": key}).encode("utf-8"))
+            body = base64.b64decode(fx["body"]) if fx.get("encoding") == "base64" else fx["body"].encode("utf-8")
+            self._send(fx.get("status", 200), fx.get("content_type", "application/json"), body)
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    srv.daemon_threads = True
+    srv.stats = stats
+    return srv
+
+def base_env(port: int, host: str = "127.0.0.1") -> dict:
+    return {k: f"http://{host}:{port}/{v}" for k, v in BASE_ENVS.items()}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="YouTube/News API 녹화 재생 서버")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve")
+    s.add_argument("--dir", required=True)
+    s.add_argument("--port", type=int, default=8765)
+    s.add_argument("--latency-ms", type=float, default=0)
+    s.add_argument("--jitter-ms", type=float, default=0)
+    s.add_argument("--error-rate", type=float, default=0.0)
+    e = sub.add_parser("env")
+    e.add_argument("--port", type=int, default=8765)
+    a = ap.parse_args(argv)
+    if a.cmd == "env":
+        for k, v in base_env(a.port).items():
+            print(f"export {k}={v}")
+        return
+    srv = make_server(a.dir, a.port, a.latency_ms, a.jitter_ms, a.error_rate)
+    print(f"replay: {a.dir} → http://127.0.0.1:{a.port} (Ctrl+C 종료)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os, json
+from pathlib import Path
+from datetime import datetime
+
+# 주간 스냅샷 사전 집계: week → month → quarter → year
+# - 주간 스냅샷이 기록될 때마다 해당 주 집계를 만들고, 그 주가 속한 월/분기/연 집계만 다시 합친다
+#   (월 = 주 집계 몇 개, 분기 = 월 3개, 연 = 분기 4개) → 리포트는 기간당 한 줄만 읽는다
+ROLLUP_PATH = Path(os.getenv("ROLLUP_PATH", "data/history_store/_rollups.json"))
+TOP_N = 5
+KINDS = ("week", "month", "quarter", "year")
+
+def _empty():
+    return {"weeks": [], "topics": {}, "top5": [], "rising": {}, "competition": {}}
+
+def _to_int(x):
+    try: return int(x)
+    except (TypeError, ValueError): return 0
+
+def _rising_score(r):
+    # 월간 PDF 기존 산식: delta*10 + 변화율(없으면 NEW 가중 50)
+    pct = r.get("change_pct")
+    try: pct = float(pct) if pct not in (None, "") else None
+    except (TypeError, ValueError): pct = None
+    return _to_int(r.get("delta")) * 10 + (pct if pct is not None else 50)
+
+def week_aggregate(stamp: str, tables: dict):
+    """주간 테이블 rows → 합칠 수 있는 집계 (카운트/합계/Top N)."""
+    agg = _empty()
+    agg["weeks"] = [stamp]
+    for r in tables.get("topics", []):
+        t = (r.get("topic") or "").strip()
+        if t: agg["topics"][t] = agg["topics"].get(t, 0) + 1
+    top = [{"title": r.get("title") or "", "url": r.get("url") or "", "views": _to_int(r.get("views"))}
+           for r in tables.get("top5", [])]
+    agg["top5"] = sorted(top, key=lambda x: x["views"], reverse=True)[:TOP_N]
+    for r in tables.get("rising", []):
+        k = r.get("keyword") or ""
+        agg["rising"][k] = agg["rising"].get(k, 0) + _rising_score(r)
+    for r in tables.get("competition", []):
+        t = r.get("archetype") or ""
+        if not t: continue
+        u0, t0 = agg["competition"].get(t, (0, 0))
+        agg["competition"][t] = [u0 + _to_int(r.get("uploads")), t0 + _to_int(r.get("top_hits"))]
+    return agg
+
+def merge(aggs):
+    out = _empty()
+    for a in aggs:
+        out["weeks"] += a["weeks"]
+        for k, n in a["topics"].items(): out["topics"][k] = out["topics"].get(k, 0) + n
+        for k, s in a["rising"].items(): out["rising"][k] = out["rising"].get(k, 0) + s
+        for k, (u, t) in a["competition"].items():
+            u0, t0 = out["competition"].get(k, (0, 0))
+            out["competition"][k] = [u0 + u, t0 + t]
+        out["top5"] += a["top5"]
+    out["weeks"].sort()
+    out["top5"] = sorted(out["top5"], key=lambda x: x["views"], reverse=True)[:TOP_N]
+    return out
+
+def period_key(kind: str, d) -> str:
+    """date/datetime 또는 YYYYMMDD → 기간 키 (2026-10 / 2026-Q4 / 2026)."""
+    if isinstance(d, str): d = datetime.strptime(d, "%Y%m%d")
+    if kind == "week": return d.strftime("%Y%m%d")
+    if kind == "month": return f"{d.year}-{d.month:02d}"
+    if kind == "quarter": return f"{d.year}-Q{(d.month - 1)//3 + 1}"
+    if kind == "year": return str(d.year)
+    raise ValueError(f"알 수 없는 기간: {kind}")
+
+def _parent(kind: str, key: str):
+    """기간 키 → (상위 종류, 상위 키)."""
+    if kind == "week": return "month", period_key("month", key)
+    if kind == "month":
+        y, m = key.split("-"); return "quarter", f"{y}-Q{(int(m) - 1)//3 + 1}"
+    if kind == "quarter": return "year", key.split("-")[0]
+    return None, None
+
+def _load():
+    try:
+        data = json.loads(ROLLUP_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        data = {}
+    for k in KINDS: data.setdefault(k, {})
+    return data
+
+def _save(data):
+    ROLLUP_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ROLLUP_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(ROLLUP_PATH)
+
+def _children(pkind: str, pkey: str):
+    """상위 기간 키 → 가능한 자식 키 (월: 그 달의 날짜 31개, 분기: 월 3개, 연: 분기 4개) — 전체를 훑지 않는다."""
+    if pkind == "month":
+        y, m = pkey.split("-"); return [f"{y}{m}{d:02d}" for d in range(1, 32)]
+    if pkind == "quarter":
+        y, q = pkey.split("-Q"); return [f"{y}-{(int(q) - 1)*3 + i:02d}" for i in (1, 2, 3)]
+    if pkind == "year":
+        return [f"{pkey}-Q{i}" for i in (1, 2, 3, 4)]
+    return []
+
+def update_week(stamp: str, tables: dict, data=None, save: bool = True):
+    """주 집계 갱신 후 그 주가 속한 월 → 분기 → 연 집계만 자식 몇 개로 다시 합친다."""
+    data = data if data is not None else _load()
+    data["week"][stamp] = week_aggregate(stamp, tables)
+    kind, key = "week", stamp
+    while True:
+        pkind, pkey = _parent(kind, key)
+        if not pkind: break
+        children = [data[kind][ck] for ck in _children(pkind, pkey) if ck in data[kind]]
+        data[pkind][pkey] = merge(children)
+        kind, key = pkind, pkey
+    if save: _save(data)
+    return data
+
+def get(kind: str, key: str):
+    return _load()[kind].get(key)
+
+def rebuild():
+    """history store 전체 파티션으로 집계 재생성."""
+    from . import history
+    data = {k: {} for k in KINDS}
+    for stamp in history.partitions():
+        update_week(stamp, history.read_partition(stamp), data=data, save=False)
+    _save(data)
+    return data
+
+if __name__ == "__main__":
+    # 집계 파일이 없거나 깨졌을 때 수동 재생성: python -m utils.rollup
+    d = rebuild()
+    print({k: len(v) for k, v in d.items()})
@@ -0,0 +1,125 @@
+import os, json, hashlib, math, re
+from pathlib import Path
+from collections import Counter
+from .io import log_event, log_warn, log_exclude
+from .nlp import tokens
+from .trace import span
+
+# 앵커 영상(config/anchors.yaml) 제목+태그 TF-IDF 희소행렬 → 후보 배치 코사인 유사도
+# numpy/scipy 가 없으면 점수 없이 통과 (선택 의존성)
+SIM_CACHE = Path(os.getenv("ANCHOR_SIM_CACHE", "data/cache/anchor_tfidf.npz"))
+
+def _video_id(url: str):
+    m = re.search(r"(?:youtu\.be/|[?&]v=)([\w-]{11})", url or "")
+    return m.group(1) if m else None
+
+def _doc_tokens(v: dict):
+    toks = list(tokens(v.get("title") or ""))
+    for tag in v.get("tags") or []:
+        toks += tokens(tag)
+    return toks
+
+class AnchorIndex:
+    """앵커 문서 TF-IDF 행렬(L2 정규화, anchors × vocab). 후보는 같은 vocab/idf 로 투영."""
+    def __init__(self, vocab, idf, matrix):
+        self.vocab = vocab                    # token -> col
+        self.idf = idf                        # np.ndarray (V,)
+        self.matrix = matrix                  # scipy.sparse.csr_matrix (A, V)
+
+    @classmethod
+    def build(cls, docs):
+        import numpy as np
+        from scipy import sparse
+        df = Counter()
+        for toks in docs: df.update(set(toks))
+        vocab = {t: i for i, t in enumerate(sorted(df))}
+        n = len(docs)
+        idf = np.array([math.log((1 + n) / (1 + df[t])) + 1.0 for t in sorted(df)], dtype=np.float32)
+        return cls(vocab, idf, _tfidf(docs, vocab, idf, sparse, np))
+
+    def save(self, path: Path, key: str):
+        import numpy as np
+        path.parent.mkdir(parents=True, exist_ok=True)
+        m = self.matrix
+        with path.open("wb") as fp:
+            np.savez(fp, key=np.array(key), vocab=np.array(json.dumps(list(self.vocab), ensure_ascii=False)),
+                     idf=self.idf, data=m.data, indices=m.indices, indptr=m.indptr, shape=np.array(m.shape))
+
+    @classmethod
+    def load(cls, path: Path, key: str):
+        import numpy as np
+        from scipy import sparse
+        try:
+            z = np.load(path, allow_pickle=False)
+        except Exception:
+            return None
+        if str(z["key"]) != key: return None
+        vocab = {t: i for i, t in enumerate(json.loads(str(z["vocab"])))}
+        m = sparse.csr_matrix((z["data"], z["indices"], z["indptr"]), shape=tuple(z["shape"]))
+        return cls(vocab, z["idf"], m)
+
+    def score(self, videos):
+        """후보 배치 → 앵커와의 최대 코사인 유사도 배열 (한 번의 희소행렬 곱)."""
+        import numpy as np
+        from scipy import sparse
+        if not videos or self.matrix.shape[0] == 0:
+            return np.zeros(len(videos), dtype=np.float32)
+        X = _tfidf([_doc_tokens(v) for v in videos], self.vocab, self.idf, sparse, np)
+        S = X @ self.matrix.T
+        return np.asarray(S.max(axis=1).todense()).ravel()
+
+def _tfidf(docs, vocab, idf, sparse, np):
+    # (행, 열) 쌍만 파이썬에서 모으고 가중치/정규화는 벡터 연산으로
+    rows, cols = [], []
+    get = vocab.get
+    for r, toks in enumerate(docs):
+        for t in toks:
+            c = get(t)
+            if c is not None:
+                rows.append(r); cols.append(c)
+    X = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(docs), len(vocab)))
+    X.sum_duplicates()
+    X.data = (1 + np.log(X.data)) * idf[X.indices]
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(X).tocsr().astype(np.float32)
+
+_index = {}
+
+def anchor_index(cat: str = "story"):
+    """cat 앵커 영상 인덱스 (프로세스 메모 + 디스크 캐시). 의존성/데이터 없으면 None."""
+    if cat in _index: return _index[cat]
+    try:
+        import numpy, scipy.sparse  # noqa: F401
+    except ImportError:
+        log_warn("numpy/scipy 없음 → 앵커 유사도 생략")
+        _index[cat] = None; return None
+    from .channels import load_anchors
+    from .youtube import hydrate
+    ids = [i for i in (_video_id(u) for u in load_anchors().get(cat, {}).get("videos", [])) if i]
+    # 앵커 영상 제목/태그는 불변 → 저장소에 있으면 다시 받지 않는다
+    recs = hydrate(ids, max_age=float("inf"))
+    docs = [_doc_tokens(v) for v in recs]
+    key = hashlib.sha1(json.dumps([cat, docs], ensure_ascii=False).encode("utf-8")).hexdigest()
+    path = SIM_CACHE.with_name(f"{SIM_CACHE.stem}-{cat}{SIM_CACHE.suffix}")
+    idx = AnchorIndex.load(path, key) if path.exists() else None
+    if idx is None and docs:
+        idx = AnchorIndex.build(docs)
+        idx.save(path, key)
+        log_event("anchor_index", cat=cat, count=len(docs), note=f"vocab={len(idx.vocab)}")
+    _index[cat] = idx
+    return idx
+
+@span("similarity")
+def attach_similarity(videos, cat: str = "story", min_score: float = 0.0, step=None):
+    """배치 점수를 v["sim"] 에 붙이고 min_score 미만은 제외. 인덱스가 없으면 그대로 통과."""
+    videos = list(videos)
+    idx = anchor_index(cat)
+    if idx is None or not videos: return videos
+    keep = []
+    for v, s in zip(videos, idx.score(videos)):
+        v["sim"] = round(float(s), 3)
+        if v["sim"] < min_score:
+            log_exclude("sim", v, step=step); continue
+        keep.append(v)
+    return keep
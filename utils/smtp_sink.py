@@ -0,0 +1,84 @@
+"""
+로컬 SMTP 대역 서버 (오프라인 실행·벤치마크용)
+
+- python -m utils.smtp_sink --port 8025  → 받은 메일은 저장만 하고 실제로 보내지 않는다
+- EHLO/AUTH(PLAIN·LOGIN)/MAIL/RCPT/DATA/RSET/NOOP/QUIT 만 지원, STARTTLS 는 미지원(454)
+  → 클라이언트는 SMTP_USE_TLS=0 으로 붙는다
+"""
+import argparse, threading, socketserver
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _say(self, line: str):
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+
+    def handle(self):
+        srv = self.server
+        self._say("220 smtp-sink ready")
+        mail_from, rcpt = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw: return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            cmd = line.split(" ", 1)[0].upper()
+            if cmd in ("EHLO", "HELO"):
+                self.wfile.write(b"250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif cmd == "AUTH":
+                parts = line.split()
+                if len(parts) > 1 and parts[1].upper() == "LOGIN":
+                    # 사용자/비밀번호 프롬프트 (첫 응답이 같이 오면 한 번만 묻는다)
+                    for _ in range(3 - len(parts)):
+                        self._say("334 VXNlcm5hbWU6"); self.rfile.readline()
+                    self._say("334 UGFzc3dvcmQ6"); self.rfile.readline()
+                elif len(parts) == 2:
+                    self._say("334 "); self.rfile.readline()
+                self._say("235 2.7.0 accepted")
+            elif cmd == "MAIL":
+                mail_from, rcpt = line.split(":", 1)[-1].strip(), []
+                self._say("250 OK")
+            elif cmd == "RCPT":
+                rcpt.append(line.split(":", 1)[-1].strip())
+                self._say("250 OK")
+            elif cmd == "DATA":
+                self._say("354 end with <CRLF>.<CRLF>")
+                buf = []
+                while True:
+                    l = self.rfile.readline()
+                    if not l or l in (b".\r\n", b".\n"): break
+                    buf.append(l[1:] if l.startswith(b"..") else l)
+                with srv.lock:
+                    srv.messages.append({"from": mail_from, "to": rcpt, "data": b"".join(buf)})
+                self._say("250 OK queued")
+            elif cmd in ("RSET", "NOOP"):
+                self._say("250 OK")
+            elif cmd == "QUIT":
+                self._say("221 bye"); return
+            elif cmd == "STARTTLS":
+                self._say("454 TLS not available")
+            else:
+                self._say("502 command not implemented")
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, addr):
+        super().__init__(addr, _Handler)
+        self.lock = threading.Lock()
+        self.messages = []    # {"from","to","data"(bytes)}
+
+def make_server(port: int = 8025, host: str = "127.0.0.1") -> SinkServer:
+    return SinkServer((host, port))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="로컬 SMTP 대역 서버")
+    ap.add_argument("--port", type=int, default=8025)
+    a = ap.parse_args(argv)
+    srv = make_server(a.port)
+    print(f"smtp-sink: 127.0.0.1:{a.port} (Ctrl+C 종료)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        print(f"받은 메일 {len(srv.messages)}통")
+
+if __name__ == "__main__":
+    main()
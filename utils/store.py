@@ -0,0 +1,232 @@
+import os, json, time, sqlite3, threading
+from pathlib import Path
+
+# 영상 메타데이터 로컬 저장소 (id 기준)
+# - 불변 필드: 제목/태그/채널/길이/게시일/설명
+# - 조회수: 시각별 스냅샷 (views 테이블)
+STORE_PATH = Path(os.getenv("VIDEO_STORE_PATH", "data/cache/videos.sqlite"))
+STATS_MAX_AGE = float(os.getenv("VIDEO_STATS_MAX_AGE_HOURS", "12")) * 3600
+
+_lock = threading.Lock()
+_conn = None
+
+def _db():
+    global _conn
+    if _conn is None:
+        STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(STORE_PATH), check_same_thread=False)
+        _conn.executescript("""
+        CREATE TABLE IF NOT EXISTS videos(
+            id TEXT PRIMARY KEY, title TEXT, tags TEXT, channel TEXT,
+            duration_sec INTEGER, published_at TEXT, description TEXT, first_seen REAL);
+        CREATE TABLE IF NOT EXISTS views(
+            id TEXT, ts REAL, views INTEGER, PRIMARY KEY(id, ts));
+        CREATE TABLE IF NOT EXISTS channels(
+            ref TEXT PRIMARY KEY, channel_id TEXT, uploads TEXT, cursor TEXT);
+        CREATE TABLE IF NOT EXISTS channel_videos(
+            ref TEXT, video_id TEXT, published_at TEXT, PRIMARY KEY(ref, video_id));
+        CREATE TABLE IF NOT EXISTS kw_daily_seen(
+            day TEXT, seen TEXT, keyword TEXT, n INTEGER, PRIMARY KEY(day, seen, keyword)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS ix_videos_published ON videos(published_at);
+        CREATE TABLE IF NOT EXISTS news_sigs(
+            id INTEGER PRIMARY KEY, day TEXT, title TEXT, sig TEXT);
+        CREATE TABLE IF NOT EXISTS news_bands(
+            band INTEGER, sig_id INTEGER, PRIMARY KEY(band, sig_id)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS kw_heavy(
+            token TEXT PRIMARY KEY, count REAL, err REAL) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS kw_heavy_meta(
+            id INTEGER PRIMARY KEY CHECK(id=0), landmark REAL);
+        """)
+        # 예전 kw_daily(발견일 없음) → 버리고 kwseries 가 저장소에서 한 번 다시 쌓는다
+        if _conn.execute("SELECT 1 FROM sqlite_master WHERE name='kw_daily'").fetchone():
+            _conn.execute("DROP TABLE kw_daily")
+            _conn.execute("DELETE FROM kw_daily_seen")
+        _conn.commit()
+    return _conn
+
+def stale_ids(ids, max_age=None):
+    """저장소에 없거나 조회수 스냅샷이 max_age(초)보다 오래된 id (입력 순서 유지)."""
+    max_age = STATS_MAX_AGE if max_age is None else max_age
+    ids = list(dict.fromkeys(i for i in ids if i))
+    if not ids: return []
+    fresh = set()
+    now = time.time()
+    with _lock:
+        db = _db()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i+500]
+            q = f"SELECT id, MAX(ts) FROM views WHERE id IN ({','.join('?'*len(chunk))}) GROUP BY id"
+            fresh.update(vid for vid, ts in db.execute(q, chunk) if now - ts <= max_age)
+    return [i for i in ids if i not in fresh]
+
+def save_records(records):
+    """정규화된 레코드 저장. 새로 들어온 id 목록을 돌려준다."""
+    if not records: return []
+    now = time.time()
+    new = []
+    with _lock:
+        db = _db()
+        for r in records:
+            cur = db.execute(
+                "INSERT OR IGNORE INTO videos(id,title,tags,channel,duration_sec,published_at,description,first_seen) VALUES(?,?,?,?,?,?,?,?)",
+                (r["id"], r.get("title"), json.dumps(r.get("tags") or [], ensure_ascii=False), r.get("channel"),
+                 r.get("durationSec") or 0, r.get("publishedAt"), r.get("desc") or "", now))
+            if cur.rowcount: new.append(r["id"])
+            db.execute("INSERT OR REPLACE INTO views(id,ts,views) VALUES(?,?,?)", (r["id"], now, r.get("views") or 0))
+        db.commit()
+    return new
+
+def get_records(ids):
+    """id 순서대로 레코드(최신 조회수 포함). 저장소에 없는 id 는 건너뛴다."""
+    ids = list(dict.fromkeys(i for i in ids if i))
+    rows = {}
+    with _lock:
+        db = _db()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i+500]
+            marks = ",".join("?"*len(chunk))
+            q = f"""SELECT v.id, v.title, v.tags, v.channel, v.duration_sec, v.published_at, v.description,
+                           (SELECT views FROM views w WHERE w.id=v.id ORDER BY ts DESC LIMIT 1), v.first_seen
+                    FROM videos v WHERE v.id IN ({marks})"""
+            for vid, title, tags, ch, dur, pub, desc, views, seen in db.execute(q, chunk):
+                rows[vid] = {
+                    "id": vid, "title": title, "tags": json.loads(tags or "[]"), "channel": ch,
+                    "publishedAt": pub, "views": views or 0, "durationSec": dur or 0, "desc": desc or "",
+                    "firstSeen": seen,
+                }
+    return [rows[i] for i in ids if i in rows]
+
+def titles_after(rowid, limit=50_000):
+    """videos rowid > rowid 인 (rowid, title) 를 rowid 순으로 (제목 색인 증분 갱신용)."""
+    with _lock:
+        return list(_db().execute("SELECT rowid, title FROM videos WHERE rowid>? ORDER BY rowid LIMIT ?", (rowid, limit)))
+
+def max_video_rowid():
+    with _lock:
+        return _db().execute("SELECT COALESCE(MAX(rowid), 0) FROM videos").fetchone()[0]
+
+def view_history(video_id):
+    """[(ts, views), ...] 오래된 순."""
+    with _lock:
+        return list(_db().execute("SELECT ts, views FROM views WHERE id=? ORDER BY ts", (video_id,)))
+
+# ---- 앵커 채널: 해석 결과(업로드 재생목록) + 증분 동기화 커서 ----
+def get_channel(ref):
+    """ref(URL) → {"channel_id","uploads","cursor"} 또는 None."""
+    with _lock:
+        row = _db().execute("SELECT channel_id, uploads, cursor FROM channels WHERE ref=?", (ref,)).fetchone()
+    return {"channel_id": row[0], "uploads": row[1], "cursor": row[2]} if row else None
+
+def save_channel(ref, channel_id, uploads):
+    with _lock:
+        _db().execute("INSERT OR IGNORE INTO channels(ref, channel_id, uploads, cursor) VALUES(?,?,?,NULL)",
+                      (ref, channel_id, uploads))
+        _db().commit()
+
+def add_channel_videos(ref, pairs, cursor=None):
+    """[(video_id, published_at)] 기록 + 커서 전진."""
+    with _lock:
+        db = _db()
+        db.executemany("INSERT OR IGNORE INTO channel_videos(ref, video_id, published_at) VALUES(?,?,?)",
+                       [(ref, vid, pub) for vid, pub in pairs])
+        if cursor:
+            db.execute("UPDATE channels SET cursor=? WHERE ref=? AND (cursor IS NULL OR cursor<?)", (cursor, ref, cursor))
+        db.commit()
+
+def channel_video_ids(refs, since=None):
+    """refs 채널들의 업로드 id (게시일 since 이후, 최신순)."""
+    refs = list(refs)
+    if not refs: return []
+    q = f"SELECT video_id FROM channel_videos WHERE ref IN ({','.join('?'*len(refs))})"
+    args = list(refs)
+    if since:
+        q += " AND published_at>=?"; args.append(since)
+    with _lock:
+        return [r[0] for r in _db().execute(q + " ORDER BY published_at DESC", args)]
+
+# ---- 키워드 일별 시계열 (게시일 × 발견일 기준 업로드 수) ----
+def add_keyword_counts(counts):
+    """{(day, seen_day, keyword): n} 누적."""
+    if not counts: return
+    with _lock:
+        db = _db()
+        db.executemany("""INSERT INTO kw_daily_seen(day, seen, keyword, n) VALUES(?,?,?,?)
+                          ON CONFLICT(day, seen, keyword) DO UPDATE SET n = n + excluded.n""",
+                       [(d, s, k, n) for (d, s, k), n in counts.items()])
+        db.commit()
+
+def clear_keyword_counts():
+    with _lock:
+        _db().execute("DELETE FROM kw_daily_seen"); _db().commit()
+
+def keyword_counts(since_day, until_day=None, seen_before=None):
+    """게시일 [since_day, until_day) 키워드별 합계. seen_before: 그 날짜 전에 발견한 영상만."""
+    q = "SELECT keyword, SUM(n) FROM kw_daily_seen WHERE day>=?"
+    args = [since_day]
+    if until_day:
+        q += " AND day<?"; args.append(until_day)
+    if seen_before:
+        q += " AND seen<?"; args.append(seen_before)
+    with _lock:
+        return dict(_db().execute(q + " GROUP BY keyword", args))
+
+def keyword_series_state():
+    """(적재된 행 수, 가장 이른 발견일, 저장소 영상 수) — 재적재/콜드 스타트 판단용."""
+    with _lock:
+        db = _db()
+        n, first = db.execute("SELECT COUNT(*), MIN(seen) FROM kw_daily_seen").fetchone()
+        return n, first, db.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+def records_published(since, until=None):
+    """게시일 [since, until) 영상 id (저장소 전체에서)."""
+    q = "SELECT id FROM videos WHERE published_at>=?"
+    args = [since]
+    if until:
+        q += " AND published_at<?"; args.append(until)
+    with _lock:
+        ids = [r[0] for r in _db().execute(q, args)]
+    return get_records(ids)
+
+# ---- 뉴스 헤드라인 MinHash 서명 (며칠에 걸친 같은 기사 반복 억제) ----
+def add_news_signatures(day, rows):
+    """rows: [(title, sig(tuple), band_keys)]"""
+    if not rows: return
+    with _lock:
+        db = _db()
+        for title, sig, bands in rows:
+            cur = db.execute("INSERT INTO news_sigs(day, title, sig) VALUES(?,?,?)", (day, title, json.dumps(list(sig))))
+            db.executemany("INSERT OR IGNORE INTO news_bands(band, sig_id) VALUES(?,?)", [(b, cur.lastrowid) for b in bands])
+        db.commit()
+
+def news_signatures(bands, since_day, until_day):
+    """밴드가 하나라도 겹치는 [since_day, until_day) 서명 → [(title, sig)]"""
+    bands = list(bands)
+    if not bands: return []
+    q = f"""SELECT DISTINCT s.title, s.sig FROM news_bands b JOIN news_sigs s ON s.id=b.sig_id
+            WHERE b.band IN ({",".join("?"*len(bands))}) AND s.day>=? AND s.day<?"""
+    with _lock:
+        return [(t, tuple(json.loads(sig))) for t, sig in _db().execute(q, bands + [since_day, until_day])]
+
+def prune_news_signatures(before_day):
+    with _lock:
+        db = _db()
+        db.execute("DELETE FROM news_bands WHERE sig_id IN (SELECT id FROM news_sigs WHERE day<?)", (before_day,))
+        db.execute("DELETE FROM news_sigs WHERE day<?", (before_day,))
+        db.commit()
+
+# ---- 키워드 heavy hitter (Space-Saving, 감쇠 가중 카운트) ----
+def load_heavy_hitters():
+    """→ (landmark 또는 None, {token: (count, err)})"""
+    with _lock:
+        db = _db()
+        row = db.execute("SELECT landmark FROM kw_heavy_meta WHERE id=0").fetchone()
+        return (row[0] if row else None), {t: (c, e) for t, c, e in db.execute("SELECT token, count, err FROM kw_heavy")}
+
+def save_heavy_hitters(landmark, upserts, deletes=()):
+    """upserts: [(token, count, err)] — 바뀐 항목만, deletes: 밀려난 token"""
+    with _lock:
+        db = _db()
+        db.execute("INSERT OR REPLACE INTO kw_heavy_meta(id, landmark) VALUES(0, ?)", (landmark,))
+        db.executemany("DELETE FROM kw_heavy WHERE token=?", [(t,) for t in deletes])
+        db.executemany("INSERT OR REPLACE INTO kw_heavy(token, count, err) VALUES(?,?,?)", upserts)
+        db.commit()
@@ -0,0 +1,64 @@
+import os, json
+from functools import lru_cache
+from .matcher import Matcher
+
+# 주간/월간 리포트 주제·키워드 사전 (키워드 시계열 적재에도 사용)
+# NEW_TOPIC_RULES / KEYWORDS / *_MATCHER 는 처음 참조할 때 EXTRA_*_JSON 병합 + 컴파일 (import 비용 없음)
+EXTRA_ARCHETYPES_JSON = os.getenv("EXTRA_ARCHETYPES_JSON", "")
+EXTRA_KEYWORDS_JSON   = os.getenv("EXTRA_KEYWORDS_JSON", "")
+
+_TOPIC_RULES = {
+    "재테크/연금/퇴직": ["연금","퇴직","노후","재테크","배당","주식","ETF","연금저축","퇴직연금","국민연금"],
+    "부동산/임대": ["부동산","아파트","전세","월세","임대","청약","등기"],
+    "의학정보/병원": ["치매","골다공증","허리","무릎","척추","고혈압","고지혈","관상동맥","검진","병원","의사","수술"],
+    "요리/집밥/레시피": ["반찬","국","찌개","김치","집밥","요리","레시피","전통","된장","간장","건강식","밑반찬"],
+    "취미/여가/여행": ["등산","낚시","여행","캠핑","트레킹","정원","텃밭","원예","풍경","꽃"],
+    "노래/트로트/향수": ["트로트","7080","가요","명곡","노래방","추억","콘서트"],
+    "법/상속/복지": ["상속","유언","증여","의료비","장기요양","요양","연금공단","복지","기초연금"],
+    "스마트폰/생활IT": ["스마트폰","휴대폰","핸드폰","카카오톡","유튜브 사용법","사진 정리","폰 설정","QR","앱 설치"],
+}
+
+_KEYWORDS = {
+    "연금": ["연금","국민연금","퇴직연금","연금저축"],
+    "부동산": ["부동산","아파트","전세","월세","임대","청약"],
+    "건강/병원": ["치매","허리","무릎","척추","고혈압","당뇨","콜레스테롤","검진","병원","의사","수술"],
+    "요리/레시피": ["요리","레시피","반찬","국","찌개","집밥","밑반찬","전통"],
+    "트로트/7080": ["트로트","7080","가요","명곡","노래","노래방"],
+    "여행/여가": ["여행","캠핑","등산","낚시","트레킹"],
+    "법/상속/복지": ["상속","유언","증여","복지","기초연금","장기요양","요양"],
+    "스마트폰/생활IT": ["스마트폰","휴대폰","핸드폰","카카오톡","폰","QR","설정","사진 정리","앱"],
+    "북한/시사": ["북한","평양","김정은","미사일","제재","북러","북중","안보","탈북"],
+    "인생사연/감동": ["사연","썰","감동","반전","가족","며느리","시어머니","고부","눈물","드라마"],
+}
+
+# ===== 사용자 확장 병합 (선택) =====
+def merge_json(target: dict, extra_json: str):
+    if not extra_json:
+        return
+    try:
+        data = json.loads(extra_json)
+        for k, v in data.items():
+            if not isinstance(v, list): continue
+            base = target.get(k, [])
+            merged = base + [x for x in v if x not in base]
+            target[k] = merged
+    except Exception:
+        pass
+
+@lru_cache(maxsize=None)
+def _load():
+    rules = {k: list(v) for k, v in _TOPIC_RULES.items()}
+    kws = {k: list(v) for k, v in _KEYWORDS.items()}
+    merge_json(rules, EXTRA_ARCHETYPES_JSON)
+    merge_json(kws, EXTRA_KEYWORDS_JSON)
+    # 병합 후 한 번만 컴파일 (영상당 한 번 훑어 모든 주제/키워드 적중을 찾음)
+    return {"NEW_TOPIC_RULES": rules, "KEYWORDS": kws,
+            "TOPIC_MATCHER": Matcher.from_groups(rules), "KEYWORD_MATCHER": Matcher.from_groups(kws)}
+
+def __getattr__(name):
+    try:
+        value = _load()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
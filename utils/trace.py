@@ -0,0 +1,74 @@
+import os, time, itertools, functools, threading
+from contextvars import ContextVar
+from .io import OUT_DIR, now_kst, log_record, log_info
+
+# 구간 계측(span): 끝날 때 run-YYYYMMDD.jsonl 에 event="span" 한 줄
+#   {"name","span_id","parent_id","dur_ms","thread", ...필드}  ts = 시작 시각
+# - with span("hydrate", ids=n) as sp: ... sp.set(kept=k)   /   @span("extract_top_keywords")
+# - 부모는 contextvars 로 추적, 스레드 풀로 넘길 함수는 bind() 로 감싸야 부모가 이어진다
+TRACE = os.getenv("TRACE", "1") == "1"
+
+_current = ContextVar("trace_span", default=None)
+_ids = itertools.count(1)
+
+class span:
+    def __init__(self, name: str, **fields):
+        self.name = name
+        self.fields = fields
+        self.id = self.parent = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        if not TRACE: return self
+        self.parent = _current.get()
+        self.id = next(_ids)
+        self._token = _current.set(self.id)
+        self._start = now_kst()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, et, e, tb):
+        if not TRACE: return False
+        ms = (time.perf_counter() - self._t0) * 1000
+        _current.reset(self._token)
+        rec = {"ts": self._start.isoformat(), "name": self.name, "span_id": self.id, "parent_id": self.parent,
+               "dur_ms": round(ms, 3), "thread": threading.current_thread().name}
+        if et is not None: rec["error"] = et.__name__
+        rec.update(self.fields)
+        log_record("span", **rec)
+        return False
+
+    def __call__(self, fn):
+        # 데코레이터: 호출마다 새 span
+        name, fields = self.name, self.fields
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            with span(name, **fields):
+                return fn(*a, **kw)
+        return wrapper
+
+def bind(fn):
+    """현재 span 을 부모로 물려주는 함수 (ThreadPoolExecutor 는 contextvars 를 복사하지 않는다)."""
+    parent = _current.get()
+    @functools.wraps(fn)
+    def run(*a, **kw):
+        token = _current.set(parent)
+        try:
+            return fn(*a, **kw)
+        finally:
+            _current.reset(token)
+    return run
+
+def profiled(fn, name: str, *a, **kw):
+    """진입점 전체를 cProfile 로 실행 → OUT_DIR/profile-<name>.pstats 저장 + 누적 시간 상위 20개 출력."""
+    import cProfile, pstats
+    pr = cProfile.Profile()
+    try:
+        return pr.runcall(fn, *a, **kw)
+    finally:
+        path = OUT_DIR / f"profile-{name}.pstats"
+        pr.dump_stats(str(path))
+        pstats.Stats(pr).sort_stats("cumulative").print_stats(20)
+        log_info(f"profile 저장: {path} (python -m pstats {path})")
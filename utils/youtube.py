@@ -1,13 +1,24 @@
-import os, re, requests
+import os, re, heapq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
 from .io import log_exclude, log_error
+from .cache import cache_get, cache_put
+from .http_client import http_get
+from .quota import charge, QuotaExceeded
+from .matcher import compiled
+from . import store, kwseries, hitters
+from .trace import span, bind
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")   # 재생 서버 지정용
 
 DURATION_MIN = 1800   # 30min
 DURATION_MAX = 7200   # 120min
 
+# 상세 보강(videos) 동시 호출 상한
+HYDRATE_WORKERS = max(1, int(os.getenv("YT_HYDRATE_WORKERS", "4")))
+
 CHANNEL_BLACK = ["JTBC","MBC","SBS","YTN","연합뉴스","TV조선","채널A","MBN"]
 
 def _require_key():
@@ -27,105 +38,216 @@ def parse_duration(iso):
         elif part.endswith('S'): s=int(part[:-1])
     return h*3600 + m*60 + s
 
+def api_get(endpoint, params, priority="normal"):
+    """YouTube Data API GET (디스크 캐시 경유, 캐시 미스만 쿼터 차감).
+    실패 시 requests.HTTPError, 쿼터 부족 시 QuotaExceeded."""
+    hit = cache_get(endpoint, params)
+    if hit is not None: return hit
+    charge(endpoint, priority)
+    r = http_get(f"{API_BASE}/{endpoint}", params=params, timeout=30)
+    r.raise_for_status()
+    data = r.json()
+    cache_put(endpoint, params, data)
+    return data
+
 def videos_details(ids):
+    import requests
     if not ids: return []
-    url = "https://www.googleapis.com/youtube/v3/videos"
-    r = requests.get(url, params={
-        "key":YOUTUBE_API_KEY,
-        "part":"snippet,statistics,contentDetails",
-        "id":",".join(ids[:50])
-    }, timeout=30)
-    if r.status_code!=200:
-        log_error("videos_fail", status=r.status_code, detail=r.text[:120])
+    try:
+        data = api_get("videos", {
+            "key":YOUTUBE_API_KEY,
+            "part":"snippet,statistics,contentDetails",
+            "id":",".join(ids[:50])
+        })
+    except QuotaExceeded:
+        return []
+    except requests.RequestException as e:
+        resp = getattr(e, "response", None)
+        log_error("videos_fail", status=resp.status_code if resp is not None else None,
+                  detail=(resp.text if resp is not None else str(e))[:120])
         return []
-    return r.json().get("items", [])
+    return data.get("items", [])
+
+def to_record(d):
+    """videos.list 항목 → 공용 레코드."""
+    sn=d.get("snippet",{})
+    st=d.get("statistics",{})
+    cd=d.get("contentDetails",{})
+    return {
+        "id":d.get("id"),
+        "title":sn.get("title"),
+        "tags":sn.get("tags",[]) or [],
+        "channel":sn.get("channelTitle"),
+        "publishedAt":sn.get("publishedAt"),
+        "views":parse_int(st.get("viewCount")),
+        "durationSec":parse_duration(cd.get("duration")),
+        "desc":sn.get("description","") or "",
+    }
+
+def _refresh(ids, max_age=None):
+    """ids 중 오래된 것만 videos 호출 후 저장 (스레드에서 호출 가능)."""
+    with span("hydrate.batch", ids=len(ids)) as sp:
+        need=store.stale_ids(ids, max_age)
+        fresh=0
+        for i in range(0,len(need),50):
+            recs=[to_record(d) for d in videos_details(need[i:i+50])]
+            new=set(store.save_records(recs))
+            first=[r for r in recs if r["id"] in new]
+            kwseries.ingest(first)   # 처음 본 영상만 시계열/heavy hitter 적재
+            hitters.ingest(first)
+            fresh+=len(new)
+        sp.set(stale=len(need), new=fresh)
+
+def hydrate(ids, max_age=None, workers=None):
+    """저장소 경유 상세 보강: 모르는 id 나 조회수가 오래된 id 만 50개씩 videos 호출.
+    50개 배치는 workers 개까지 동시에 보내고, 결과는 입력 id 순서로 돌려준다."""
+    ids=list(dict.fromkeys(i for i in ids if i))
+    with span("hydrate", ids=len(ids)) as sp:
+        need=store.stale_ids(ids, max_age)
+        batches=[need[i:i+50] for i in range(0,len(need),50)]
+        workers=min(workers or HYDRATE_WORKERS, len(batches))
+        sp.set(stale=len(need), batches=len(batches))
+        if workers>1:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(bind(lambda b: _refresh(b, max_age)), batches))
+        else:
+            for b in batches: _refresh(b, max_age)
+        hitters.flush()
+        return store.get_records(ids)
 
 def _normalize(s):
     s = (s or "").lower()
     s = re.sub(r"[#\s\[\]\(\)\-….,!?\"'`]", "", s)
     return s
 
-def _match_must(title, tags, must_list):
-    norm_t = _normalize(title)
-    norm_tags = _normalize(" ".join(tags or []))
-    return any(m in norm_t or m in norm_tags for m in must_list)
+def _match_must(title, tags, must_matcher):
+    # 제목/태그 경계를 넘는 적중이 없도록 구분자로 이어 한 번에 훑는다
+    return must_matcher.search(_normalize(title) + "\x00" + _normalize(" ".join(tags or [])))
 
-def search_story_candidates(must, days, extra, max_pages=5):
-    _require_key()
-    published_after = (datetime.utcnow()-timedelta(days=days)).replace(tzinfo=timezone.utc).isoformat()
+def _cutoff(days, now=None):
+    now = now or datetime.utcnow().replace(tzinfo=timezone.utc)
+    return now - timedelta(days=days)
 
+def _story_params(must, days, extra, until_days=0, now=None):
     or_terms = [f"\"{m}\"" for m in must]
     q = f"({' OR '.join(or_terms)}) {extra}"
 
-    url="https://www.googleapis.com/youtube/v3/search"
     params={
         "key":YOUTUBE_API_KEY,
         "part":"snippet",
         "type":"video",
         "order":"viewCount",
-        "publishedAfter":published_after,
+        "publishedAfter":_cutoff(days, now).isoformat(),
         "videoDuration":"long",
         "safeSearch":"none",
         "maxResults":50,
         "q":q
     }
-
-    items=[]
+    if until_days:
+        params["publishedBefore"]=_cutoff(until_days, now).isoformat()
+    return params
+
+def iter_search_pages(params, max_pages=5, priority="normal"):
+    """search 페이지를 순서대로 받아 페이지마다 새 videoId 목록을 내보낸다 (중복 제거)."""
+    import requests
+    params=dict(params)
+    seen=set()
     page=None
     for _ in range(max_pages):
         if page: params["pageToken"]=page
-        r=requests.get(url,params=params,timeout=30)
-        if r.status_code!=200: break
-        data=r.json()
-        items+=data.get("items",[])
+        try: data=api_get("search",params,priority=priority)
+        except QuotaExceeded: return
+        except requests.RequestException as e:
+            log_error("search_fail", detail=str(e)[:120]); return
+        new=[]
+        for i in data.get("items",[]):
+            vid=i.get("id",{}).get("videoId")
+            if vid and vid not in seen:
+                seen.add(vid);new.append(vid)
+        yield new
         page=data.get("nextPageToken")
-        if not page: break
-
-    ids=list(dict.fromkeys([i.get("id",{}).get("videoId") for i in items if i.get("id",{}).get("videoId")]))
-    det=[]
-    for i in range(0,len(ids),50):
-        det+=videos_details(ids[i:i+50])
-
-    out=[]
-    for d in det:
-        sn=d.get("snippet",{})
-        st=d.get("statistics",{})
-        cd=d.get("contentDetails",{})
-        dur=parse_duration(cd.get("duration"))
-        out.append({
-            "id":d.get("id"),
-            "title":sn.get("title"),
-            "tags":sn.get("tags",[]) or [],
-            "channel":sn.get("channelTitle"),
-            "publishedAt":sn.get("publishedAt"),
-            "views":parse_int(st.get("viewCount")),
-            "durationSec":dur
-        })
+        if not page: return
+
+def search_story_candidates(must, days, extra, max_pages=5, until_days=0, now=None, priority="normal"):
+    """최근 days일(until_days>0이면 until_days일 이전까지) 구간 검색 + 상세 보강, 조회수 내림차순.
+    priority="low" 검색은 쿼터가 부족하면 거절되고 그때까지 받은 페이지만 쓴다."""
+    _require_key()
+    params=_story_params(must, days, extra, until_days, now)
+
+    # 페이지 토큰 때문에 검색은 순차, 각 페이지 id 의 상세 보강은 다음 페이지 검색과 겹쳐서 진행
+    ids=[];pending=[]
+    with ThreadPoolExecutor(max_workers=HYDRATE_WORKERS) as ex:
+        for new in iter_search_pages(params, max_pages, priority):
+            ids+=new
+            if new: pending.append(ex.submit(bind(_refresh),new))
+        for f in pending: f.result()
+    hitters.flush()   # _refresh 가 쌓은 heavy hitter 변경분 저장 (hydrate 와 같은 지점)
+
+    out=store.get_records(ids)
     out.sort(key=lambda x:x["views"], reverse=True)
     return out
 
-def filter_story(videos, must, include, exclude, step):
-    must_norm=[_normalize(m) for m in must]
-    exc=[e.lower() for e in exclude]
-    keep=[]
+def stream_story_candidates(must, include, exclude, days, extra, step, max_pages=5, until_days=0, now=None, priority="normal", post=None):
+    """
+    검색 → 상세 보강 → 필터를 페이지 단위로 흘려보내는 생성기.
+    search 는 조회수순이므로 현재 페이지의 최저 조회수보다 많은 후보는 순위가 확정된다 →
+    확정된 것부터 조회수 내림차순으로 내보내고, 소비자가 멈추면 다음 페이지는 요청하지 않는다.
+    (검색 100단위를 아끼려고 다음 페이지를 미리 받아두지 않는다)
+    순서는 근사치: 페이지 순서는 YouTube 쪽 예전 조회수, floor 는 방금 보강한 조회수라
+    뒤 페이지에서 이미 내보낸 것보다 조회수가 많은 항목이 나올 수 있다 → 소비자가 최종 정렬할 것
+    post: 페이지 단위 배치 후처리(점수 부착/추가 필터) — list → list
+    """
+    _require_key()
+    params=_story_params(must, days, extra, until_days, now)
+    buf=[];seq=0
+    for ids in iter_search_pages(params, max_pages, priority):
+        recs=hydrate(ids)
+        if not recs: continue
+        kept=filter_story(recs, must, include, exclude, step)
+        if post: kept=post(kept)
+        for v in kept:
+            heapq.heappush(buf, (-v["views"], seq, v)); seq+=1
+        floor=min(r["views"] for r in recs)
+        while buf and -buf[0][0]>=floor:
+            yield heapq.heappop(buf)[2]
+    while buf:
+        yield heapq.heappop(buf)[2]
+
+def within_days(videos, days, now=None):
+    """로컬 구간 분할: publishedAt 이 최근 days일 안인 것만, 조회수 내림차순."""
+    cut = _cutoff(days, now)
+    out = []
     for v in videos:
-        t=v["title"] or ""
-        tags=v.get("tags",[])
-        ch=v.get("channel","")
-        low=t.lower()
-        Ta=" ".join(tags).lower()
-        dur=v["durationSec"]
-
-        if dur<DURATION_MIN or dur>DURATION_MAX:
-            log_exclude("duration",v,step=step); continue
-        if not any("가"<=c<="힣" for c in t):
-            log_exclude("nokr",v,step=step); continue
-        if any(b.lower() in ch.lower() for b in CHANNEL_BLACK):
-            log_exclude("news",v,step=step); continue
-        if any(e in low or e in Ta for e in exc):
-            log_exclude("black",v,step=step); continue
-        if not _match_must(t,tags,must_norm):
-            log_exclude("nomust",v,step=step); continue
-
-        keep.append(v)
+        try: pub = datetime.fromisoformat((v.get("publishedAt") or "").replace("Z", "+00:00"))
+        except ValueError: continue
+        if pub >= cut: out.append(v)
+    out.sort(key=lambda x:x["views"], reverse=True)
+    return out
+
+def filter_story(videos, must, include, exclude, step):
+    videos=list(videos)
+    with span("filter_story", step=step, n=len(videos)) as sp:
+        must_m=compiled(tuple(_normalize(m) for m in must))
+        exc_m=compiled(tuple(exclude))
+        black_m=compiled(tuple(CHANNEL_BLACK))
+        keep=[]
+        for v in videos:
+            t=v["title"] or ""
+            tags=v.get("tags",[])
+            ch=v.get("channel") or ""
+            dur=v["durationSec"]
+
+            if dur<DURATION_MIN or dur>DURATION_MAX:
+                log_exclude("duration",v,step=step); continue
+            if not any("가"<=c<="힣" for c in t):
+                log_exclude("nokr",v,step=step); continue
+            if black_m.search(ch):
+                log_exclude("news",v,step=step); continue
+            if exc_m.search(t+"\x00"+" ".join(tags)):
+                log_exclude("black",v,step=step); continue
+            if not _match_must(t,tags,must_m):
+                log_exclude("nomust",v,step=step); continue
+
+            keep.append(v)
+        sp.set(kept=len(keep))
     return keep
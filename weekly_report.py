@@ -1,32 +1,27 @@
 import os
+import argparse
 import csv
-import json
-import smtplib
-import requests
-from email.mime.text import MIMEText
-from email.header import Header
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from collections import defaultdict
 import math
 import statistics
+from utils.youtube import api_get, hydrate
+from utils.emailer import send_email_markdown
+from utils import topics, kwseries, store, history
+from utils.cache import log_cache_stats
+from utils.http_client import log_http_stats
+from utils.quota import set_entry, log_quota_summary
+from utils.trace import span, profiled
 
 # =========================
 # 환경변수 / 경로
 # =========================
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-SMTP_HOST       = os.getenv("SMTP_HOST")
-SMTP_PORT       = os.getenv("SMTP_PORT")
-SMTP_USER       = os.getenv("SMTP_USER")
-SMTP_PASS       = os.getenv("SMTP_PASS")
-REPORT_EMAIL_TO = os.getenv("REPORT_EMAIL_TO")
 
 RISING_SORT_MODE = (os.getenv("RISING_SORT_MODE", "percent") or "percent").lower()
-EXTRA_ARCHETYPES_JSON = os.getenv("EXTRA_ARCHETYPES_JSON", "")
-EXTRA_KEYWORDS_JSON   = os.getenv("EXTRA_KEYWORDS_JSON", "")
 
 OUT_DIR     = Path("data/outputs")
-HIST_DIR    = Path("data/history")      # 월간 PDF용 집계에 활용
 REPORT_PATH = OUT_DIR / "weekly_report.md"
 
 # =========================
@@ -37,19 +32,6 @@ def now_kst():
 
 def ensure_dirs():
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    HIST_DIR.mkdir(parents=True, exist_ok=True)
-
-def send_email_markdown(body: str, subject: str):
-    if not (SMTP_HOST and SMTP_PORT and SMTP_USER and SMTP_PASS and REPORT_EMAIL_TO):
-        raise EnvironmentError("SMTP 환경변수가 누락되었습니다.")
-    msg = MIMEText(body, _charset="utf-8")
-    msg["Subject"] = Header(subject, "utf-8")
-    msg["From"] = SMTP_USER
-    msg["To"]   = REPORT_EMAIL_TO
-    with smtplib.SMTP(SMTP_HOST, int(SMTP_PORT)) as s:
-        s.starttls()
-        s.login(SMTP_USER, SMTP_PASS)
-        s.sendmail(SMTP_USER, [REPORT_EMAIL_TO], msg.as_string())
 
 def parse_int(x):
     try: return int(x)
@@ -60,7 +42,7 @@ def iso_utc(dt: datetime) -> str:
 
 def write_csv(path: Path, rows: list[dict], fieldnames: list[str]):
     ensure_dirs()
-    with path.open("w", newline="", encoding="utf-8-sig") as f:
+    with span("csv.write", file=path.name, rows=len(rows)), path.open("w", newline="", encoding="utf-8-sig") as f:
         w = csv.DictWriter(f, fieldnames=fieldnames)
         w.writeheader()
         for r in rows:
@@ -72,69 +54,16 @@ def write_csv(path: Path, rows: list[dict], fieldnames: list[str]):
 DAYS_WINDOW_MONTH = 30           # 한달 분석
 MIN_VIEWS_MONTH   = 100_000
 
-CURRENT_DAYS  = 7                # 최근 7일
-PREVIOUS_DAYS = 7                # 그 전 7일
+# 급상승 비교 구간: 최근 N일 vs 그 전 N일 (7/14/28 등). 저장된 키워드 시계열로 계산 → 추가 API 호출 없음
+RISING_WINDOW_DAYS = int(os.getenv("RISING_WINDOW_DAYS", "7"))
 
 SENIOR_QUERY = "시니어 OR 노년 OR 어르신 OR 50대 OR 60대 OR 중장년"
 
-NEW_TOPIC_RULES = {
-    "재테크/연금/퇴직": ["연금","퇴직","노후","재테크","배당","주식","ETF","연금저축","퇴직연금","국민연금"],
-    "부동산/임대": ["부동산","아파트","전세","월세","임대","청약","등기"],
-    "의학정보/병원": ["치매","골다공증","허리","무릎","척추","고혈압","고지혈","관상동맥","검진","병원","의사","수술"],
-    "요리/집밥/레시피": ["반찬","국","찌개","김치","집밥","요리","레시피","전통","된장","간장","건강식","밑반찬"],
-    "취미/여가/여행": ["등산","낚시","여행","캠핑","트레킹","정원","텃밭","원예","풍경","꽃"],
-    "노래/트로트/향수": ["트로트","7080","가요","명곡","노래방","추억","콘서트"],
-    "법/상속/복지": ["상속","유언","증여","의료비","장기요양","요양","연금공단","복지","기초연금"],
-    "스마트폰/생활IT": ["스마트폰","휴대폰","핸드폰","카카오톡","유튜브 사용법","사진 정리","폰 설정","QR","앱 설치"],
-}
 BASE_3 = {"시니어 건강","시니어 북한","시니어 인생스토리"}
 
-KEYWORDS = {
-    "연금": ["연금","국민연금","퇴직연금","연금저축"],
-    "부동산": ["부동산","아파트","전세","월세","임대","청약"],
-    "건강/병원": ["치매","허리","무릎","척추","고혈압","당뇨","콜레스테롤","검진","병원","의사","수술"],
-    "요리/레시피": ["요리","레시피","반찬","국","찌개","집밥","밑반찬","전통"],
-    "트로트/7080": ["트로트","7080","가요","명곡","노래","노래방"],
-    "여행/여가": ["여행","캠핑","등산","낚시","트레킹"],
-    "법/상속/복지": ["상속","유언","증여","복지","기초연금","장기요양","요양"],
-    "스마트폰/생활IT": ["스마트폰","휴대폰","핸드폰","카카오톡","폰","QR","설정","사진 정리","앱"],
-    "북한/시사": ["북한","평양","김정은","미사일","제재","북러","북중","안보","탈북"],
-    "인생사연/감동": ["사연","썰","감동","반전","가족","며느리","시어머니","고부","눈물","드라마"],
-}
-
-# ===== 사용자 확장 병합 (선택) =====
-def merge_json(target: dict, extra_json: str):
-    if not extra_json:
-        return
-    try:
-        data = json.loads(extra_json)
-        for k, v in data.items():
-            if not isinstance(v, list): continue
-            base = target.get(k, [])
-            merged = base + [x for x in v if x not in base]
-            target[k] = merged
-    except Exception:
-        pass
-
-merge_json(NEW_TOPIC_RULES, EXTRA_ARCHETYPES_JSON)
-merge_json(KEYWORDS, EXTRA_KEYWORDS_JSON)
-
 # =========================
 # YouTube API helpers
 # =========================
-def youtube_videos_details(video_ids):
-    if not video_ids:
-        return []
-    url = "https://www.googleapis.com/youtube/v3/videos"
-    params = {
-        "key": YOUTUBE_API_KEY,
-        "part": "snippet,statistics",
-        "id": ",".join(video_ids[:50])
-    }
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json().get("items", [])
-
 def youtube_search_recent(query, published_after, published_before=None, order="viewCount", max_results=50):
     params = {
         "key": YOUTUBE_API_KEY,
@@ -149,14 +78,11 @@ def youtube_search_recent(query, published_after, published_before=None, order="
     if published_before:
         params["publishedBefore"] = published_before
 
-    r = requests.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=30)
-    r.raise_for_status()
-    items = r.json().get("items", [])
+    items = api_get("search", params).get("items", [])
     ids = [it["id"]["videoId"] for it in items if it.get("id", {}).get("videoId")]
     if not ids:
         return []
-    details = youtube_videos_details(ids)
-    detail_map = {d["id"]: d for d in details}
+    detail_map = {d["id"]: d for d in hydrate(ids)}
 
     merged = []
     for it in items:
@@ -169,7 +95,7 @@ def youtube_search_recent(query, published_after, published_before=None, order="
             "title": sn.get("title"),
             "channel": sn.get("channelTitle"),
             "publishedAt": sn.get("publishedAt"),
-            "views": parse_int((d.get("statistics") or {}).get("viewCount")),
+            "views": d["views"],
             "desc": sn.get("description","")
         })
     return merged
@@ -178,20 +104,19 @@ def youtube_search_recent(query, published_after, published_before=None, order="
 # 분석 로직
 # =========================
 def label_new_topic(title, desc):
-    text = f"{title or ''} {desc or ''}".lower()
-    for t, kws in NEW_TOPIC_RULES.items():
-        for kw in kws:
-            if kw.lower() in text:
-                return t
+    hits = topics.TOPIC_MATCHER.labels(f"{title or ''} {desc or ''}")
+    for t in topics.NEW_TOPIC_RULES:
+        if t in hits:
+            return t
     return None
 
 def count_keywords(videos):
     counts = defaultdict(int)
     buckets = defaultdict(list)
     for v in videos:
-        text = f"{v['title'] or ''} {v.get('desc','') or ''}".lower()
-        for key, kw_list in KEYWORDS.items():
-            if any(kw.lower() in text for kw in kw_list):
+        hits = topics.KEYWORD_MATCHER.labels(f"{v['title'] or ''} {v.get('desc','') or ''}")
+        for key in topics.KEYWORDS:
+            if key in hits:
                 counts[key] += 1
                 buckets[key].append(v)
     return counts, buckets
@@ -315,12 +240,8 @@ def build_weekly_markdown_and_csv():
     archetype_counts = defaultdict(int)
     archetype_top_hits = defaultdict(int)
     for v in month_videos:
-        text = f"{v['title'] or ''} {v.get('desc','') or ''}".lower()
-        hits = []
-        for t, kws in NEW_TOPIC_RULES.items():
-            if any(kw.lower() in text for kw in kws):
-                hits.append(t)
-        for t in set(hits):
+        hits = topics.TOPIC_MATCHER.labels(f"{v['title'] or ''} {v.get('desc','') or ''}")
+        for t in hits:
             archetype_counts[t] += 1
             if v["views"] >= cutoff_views:
                 archetype_top_hits[t] += 1
@@ -337,19 +258,15 @@ def build_weekly_markdown_and_csv():
             "difficulty": difficulty_from_ratio(ratio),
         })
 
-    # ====== 급상승 키워드 (7일 vs 직전 7일) ======
-    cur_after = iso_utc(now - timedelta(days=CURRENT_DAYS))
-    cur_videos = youtube_search_recent(SENIOR_QUERY, cur_after, order="date", max_results=50)
-
-    prev_after = iso_utc(now - timedelta(days=CURRENT_DAYS + PREVIOUS_DAYS))
-    prev_before = iso_utc(now - timedelta(days=CURRENT_DAYS))
-    prev_videos = youtube_search_recent(SENIOR_QUERY, prev_after, published_before=prev_before, order="date", max_results=50)
-
-    cur_counts, cur_buckets = count_keywords(cur_videos)
-    prev_counts, _         = count_keywords(prev_videos)
+    # ====== 급상승 키워드 (N일 vs 직전 N일, 저장된 일별 시계열) ======
+    days = RISING_WINDOW_DAYS
+    cur_counts, prev_counts = kwseries.window_counts(days, now.replace(tzinfo=timezone.utc))
+    # 대표 영상: 저장소에 있는 최근 N일 게시 영상 중 조회수 최대
+    cur_since = (now - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    _, cur_buckets = count_keywords(store.records_published(cur_since))
 
     growth = []
-    for key in KEYWORDS.keys():
+    for key in topics.KEYWORDS.keys():
         cur = cur_counts.get(key, 0)
         prev = prev_counts.get(key, 0)
         delta = cur - prev
@@ -392,14 +309,16 @@ def build_weekly_markdown_and_csv():
     # =========================
     # CSV 저장 + 주별 히스토리 스냅샷
     # =========================
+    topic_rows = [{"topic": t, "example_title": v["title"], "example_url": f"https://www.youtube.com/watch?v={v['id']}", "views": v["views"], "channel": v["channel"]} for t, v in topic_recos]
+    top5_rows = [{"rank": i+1, "title": v["title"], "url": f"https://www.youtube.com/watch?v={v['id']}", "views": v["views"], "channel": v["channel"]} for i, v in enumerate(top5)]
     write_csv(
         OUT_DIR / "weekly_topics.csv",
-        rows=[{"topic": t, "example_title": v["title"], "example_url": f"https://www.youtube.com/watch?v={v['id']}", "views": v["views"], "channel": v["channel"]} for t, v in topic_recos],
+        rows=topic_rows,
         fieldnames=["topic","example_title","example_url","views","channel"]
     )
     write_csv(
         OUT_DIR / "weekly_top5_videos.csv",
-        rows=[{"rank": i+1, "title": v["title"], "url": f"https://www.youtube.com/watch?v={v['id']}", "views": v["views"], "channel": v["channel"]} for i, v in enumerate(top5)],
+        rows=top5_rows,
         fieldnames=["rank","title","url","views","channel"]
     )
     write_csv(
@@ -418,18 +337,14 @@ def build_weekly_markdown_and_csv():
         fieldnames=list(tstats.keys())
     )
 
-    # 히스토리 스냅샷 저장 (월간 PDF용)
-    stamp = now_kst().strftime("%Y%m%d")
-    hist_dir = HIST_DIR / stamp
-    hist_dir.mkdir(parents=True, exist_ok=True)
-    for name in [
-        "weekly_topics.csv",
-        "weekly_top5_videos.csv",
-        "weekly_rising_keywords.csv",
-        "weekly_archetype_competition.csv",
-        "weekly_title_patterns.csv",
-    ]:
-        (hist_dir / name).write_text((OUT_DIR / name).read_text(encoding="utf-8-sig"), encoding="utf-8-sig")
+    # 히스토리 스냅샷 저장 (월간 PDF용): 날짜 파티션 한 번 기록, CSV 재읽기/복사 없음
+    history.write_week(now_kst().strftime("%Y%m%d"), {
+        "topics": topic_rows,
+        "top5": top5_rows,
+        "rising": rising_top3,
+        "competition": competition_rows,
+        "title_patterns": [tstats],
+    })
 
     # =========================
     # 메일 본문(MD)
@@ -462,8 +377,8 @@ def build_weekly_markdown_and_csv():
         lines += ["- (해당 조건의 상위 영상 없음)", ""]
 
     lines += [
-        f"## 3) 주간 급상승 키워드 TOP3 (최근 7일 vs 그 전 7일 · 정렬: {RISING_SORT_MODE})",
-        "- 산정: 제목/설명 키워드 출현 수 비교 (변화율 %, 또는 NEW/증가 개수)",
+        f"## 3) 주간 급상승 키워드 TOP3 (최근 {RISING_WINDOW_DAYS}일 vs 그 전 {RISING_WINDOW_DAYS}일 · 정렬: {RISING_SORT_MODE})",
+        "- 산정: 수집된 전체 영상의 제목/설명 키워드 출현 수 비교 (변화율 %, 또는 NEW/증가 개수)",
         ""
     ]
     if rising_top3:
@@ -501,12 +416,20 @@ def build_weekly_markdown_and_csv():
 # =========================
 # 메인
 # =========================
+@span("weekly")
 def main():
     if not YOUTUBE_API_KEY:
         raise EnvironmentError("YOUTUBE_API_KEY 가 없습니다. Secrets에 추가하세요.")
+    set_entry("weekly")
     md = build_weekly_markdown_and_csv()
+    log_cache_stats(cat="weekly")
+    log_http_stats(cat="weekly")
+    log_quota_summary(cat="weekly")
     subject = "✅ Weekly Senior Trends Report — 신규 주제/Top5/급상승/제목벤치/경쟁도"
     send_email_markdown(md, subject)
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="주간 시니어 트렌드 리포트")
+    ap.add_argument("--profile", action="store_true", help="cProfile 로 실행, data/outputs/profile-weekly.pstats 저장")
+    if ap.parse_args().profile: profiled(main, "weekly")
+    else: main()